@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+from foodgram.cache import is_memory_cache
+from foodgram.constants import TOKEN_CACHE_TIMEOUT
+
+
+def token_cache_key(key: str) -> str:
+    return f'auth-token:{key}'
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication без запроса к базе для недавних токенов.
+
+    Токен вместе с пользователем хранится в кеше; запись удаляется при
+    удалении токена (logout) и при изменении пользователя. Запрос
+    экономится только с memcached. Кеш в памяти процесса не
+    используется: удаление записи не дошло бы до других воркеров, и
+    вышедший или отключённый пользователь ещё проходил бы проверку. В
+    dbcache попадание — такой же SELECT, как поиск токена, а промах
+    добавляет ещё три запроса, поэтому там проверка идёт напрямую.
+    """
+
+    def authenticate_credentials(self, key):
+        if not is_memory_cache():
+            return super().authenticate_credentials(key)
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is not None:
+            return token.user, token
+
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, token, TOKEN_CACHE_TIMEOUT)
+        return user, token
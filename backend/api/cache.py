@@ -0,0 +1,131 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from foodgram.cache import shared_timeout
+from foodgram.constants import RESPONSE_CACHE_TIMEOUT
+
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+
+def version_key(namespace: str) -> str:
+    return f'api-version:{namespace}'
+
+
+def cache_version(namespace: str) -> int:
+    """Версия пространства имён — время последнего изменения в нс.
+
+    Если запись потеряна, версия начинается с текущего времени, а не с
+    единицы, и не совпадает ни с одной из выданных раньше.
+    """
+    return cache.get_or_set(
+        version_key(namespace), time.time_ns, shared_timeout(None)
+    )
+
+
+def changed_at(namespace: str) -> datetime:
+    """Время последнего изменения пространства имён для Last-Modified."""
+    return datetime.fromtimestamp(
+        cache_version(namespace) / 10 ** 9, tz=timezone.utc
+    )
+
+
+def bump_version(*namespaces: str) -> None:
+    """Делает недоступными все закешированные ответы пространства имён."""
+    cache.set_many(
+        {version_key(namespace): time.time_ns() for namespace in namespaces},
+        shared_timeout(None),
+    )
+
+
+def profile_namespace(user_id) -> str:
+    return f'user:{user_id}'
+
+
+def response_cache_key(namespace: str, request) -> str:
+    digest = hashlib.md5(
+        f'{request.get_host()}{request.get_full_path()}'
+        f'|{request.accepted_media_type}'.encode()
+    ).hexdigest()
+    return f'api-response:{namespace}:{cache_version(namespace)}:{digest}'
+
+
+class ResponseCacheMixin:
+    """Кеш ответов list/retrieve для анонимных запросов.
+
+    Ключ содержит версию пространства имён cache_namespace, которую
+    сигналы увеличивают при изменении данных. Вместе с данными
+    сохраняются ETag и Last-Modified, так что попадание в кеш тоже
+    отвечает 304 на условный запрос. Если задан public_max_age, ответ
+    помечается public, и его может держать nginx.
+    """
+    cache_namespace = None
+    cache_authenticated = False
+    public_max_age = None
+
+    def list(self, request, *args, **kwargs):
+        return self.mark_public(self.cached_response(
+            request, super().list, *args, **kwargs
+        ))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.mark_public(self.cached_response(
+            request, super().retrieve, *args, **kwargs
+        ))
+
+    def mark_public(self, response):
+        if self.public_max_age is not None and response.status_code in (
+            200, 304
+        ):
+            patch_cache_control(
+                response, public=True, max_age=self.public_max_age
+            )
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def get_cache_timeout(self) -> int:
+        return shared_timeout(RESPONSE_CACHE_TIMEOUT)
+
+    def get_cache_namespace(self):
+        return self.cache_namespace
+
+    def cached_response(self, request, get_response, *args, **kwargs):
+        namespace = self.get_cache_namespace()
+        if namespace is None or not (
+            self.cache_authenticated or request.user.is_anonymous
+        ):
+            return get_response(request, *args, **kwargs)
+
+        key = response_cache_key(namespace, request)
+        entry = cache.get(key)
+        if entry is None:
+            response = get_response(request, *args, **kwargs)
+            if response.status_code == 200:
+                headers = {
+                    name: response[name]
+                    for name in CACHED_HEADERS if response.has_header(name)
+                }
+                cache.set(key, (response.data, headers),
+                          self.get_cache_timeout())
+            return response
+
+        data, headers = entry
+        last_modified = headers.get('Last-Modified')
+        response = get_conditional_response(
+            request,
+            etag=headers.get('ETag'),
+            last_modified=last_modified and parse_http_date_safe(
+                last_modified
+            ),
+        )
+        if response is None:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        return response
@@ -0,0 +1,60 @@
+import base64
+import binascii
+import hashlib
+from urllib.parse import urlsplit
+
+from django.utils.functional import cached_property
+from rest_framework import serializers
+
+from foodgram.storage import content_hash
+
+
+class Base64ImageField(serializers.ImageField):
+    """Base64ImageField из drf_extra_fields с отложенным импортом.
+
+    Декодер нужен только при записи рецепта, поэтому модуль
+    drf_extra_fields загружается при первом декодировании, а не при
+    старте воркера. Чтение отдаёт URL, как обычный ImageField.
+
+    Если при обновлении пришла та же картинка (её URL, в том числе
+    абсолютный, или base64 с тем же sha256), возвращается текущий файл
+    без проверки изображения.
+    """
+
+    def to_internal_value(self, data):
+        current = self.current_file()
+        if current and isinstance(data, str) and self.is_current(
+            data, current
+        ):
+            return current
+        return self.decoder.to_internal_value(data)
+
+    def current_file(self):
+        instance = getattr(self.parent, 'instance', None)
+        if instance is None or isinstance(instance, (list, tuple)):
+            return None
+        return getattr(instance, self.source, None)
+
+    @staticmethod
+    def is_current(data: str, current) -> bool:
+        # API отдаёт абсолютный URL, поэтому хост не сравнивается.
+        if data == current.name or (
+            urlsplit(data).path == urlsplit(current.url).path
+        ):
+            return True
+        stored_hash = content_hash(current.name)
+        if stored_hash is None:
+            return False
+        if ';base64,' in data:
+            data = data.split(';base64,', 1)[1]
+        try:
+            decoded = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            return False
+        return hashlib.sha256(decoded).hexdigest() == stored_hash
+
+    @cached_property
+    def decoder(self):
+        from drf_extra_fields.fields import \
+            Base64ImageField as ExtraBase64ImageField
+        return ExtraBase64ImageField()
@@ -17,10 +17,20 @@ class RecipeFilter(filters.FilterSet):
         to_field_name='slug',
         queryset=Tag.objects.all(),
     )
+    ordering = filters.ChoiceFilter(
+        choices=(('popular', 'Популярные'), ('trending', 'В тренде')),
+        method='filter_ordering'
+    )
+
+    ORDERING_FIELDS = {
+        'popular': 'popularity',
+        'trending': 'trending_score',
+    }
 
     class Meta:
         model = Recipe
-        fields = ('author', 'is_favorited', 'is_in_shopping_cart', 'tags')
+        fields = ('author', 'is_favorited', 'is_in_shopping_cart', 'tags',
+                  'ordering')
 
     def filter_is_favorited(self, queryset, name, value):
         if self.request.user.is_anonymous:
@@ -36,6 +46,9 @@ class RecipeFilter(filters.FilterSet):
             return queryset.filter(in_cart__user=self.request.user)
         return queryset
 
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(f'-{self.ORDERING_FIELDS[value]}', '-pk')
+
 
 class CustomIngredientsFilter(filters.FilterSet):
     """Фильтры для ингредиентов."""
@@ -0,0 +1,107 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PROFILES = ('sync:1:1', 'sync:3:1', 'gthread:1:4', 'gthread:3:4')
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает gunicorn с разными профилями воркеров и измеряет '
+        'пропускную способность и задержки на одном адресе API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', action='append', dest='profiles',
+            help='класс:воркеры:потоки, например gthread:3:4. '
+                 'Можно указать несколько раз.'
+        )
+        parser.add_argument('--url', default='/api/recipes/')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"профиль":<14}{"запр/с":>9}{"p50, мс":>10}'
+            f'{"p95, мс":>10}{"ошибок":>8}'
+        )
+        for profile in options['profiles'] or DEFAULT_PROFILES:
+            worker_class, workers, threads = profile.split(':')
+            server = self.start(worker_class, workers, threads,
+                                options['port'])
+            try:
+                rps, p50, p95, errors = self.load(
+                    f'http://127.0.0.1:{options["port"]}{options["url"]}',
+                    options['requests'], options['concurrency'],
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            self.stdout.write(
+                f'{profile:<14}{rps:>9.1f}{p50:>10.1f}{p95:>10.1f}'
+                f'{errors:>8}'
+            )
+
+    def start(self, worker_class, workers, threads, port):
+        env = dict(
+            os.environ,
+            GUNICORN_BIND=f'127.0.0.1:{port}',
+            GUNICORN_WORKER_CLASS=worker_class,
+            GUNICORN_WORKERS=workers,
+            GUNICORN_THREADS=threads,
+            GUNICORN_ACCESSLOG='/dev/null',
+            GUNICORN_MAX_REQUESTS='0',
+            WARMUP_ON_START='False',
+        )
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             'foodgram.wsgi:application'],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), 1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.kill()
+        raise CommandError('gunicorn не запустился за 30 секунд')
+
+    def load(self, url, total, concurrency):
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if host != '*'),
+            'localhost'
+        )
+
+        def fetch(_):
+            request = urllib.request.Request(url, headers={'Host': host})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except OSError:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        errors = sum(not ok for _, ok in results)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        return (total / elapsed, statistics.median(latencies), p95, errors)
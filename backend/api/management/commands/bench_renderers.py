@@ -0,0 +1,84 @@
+import gzip
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api import renderers
+from api.serializers import RecipeSerializer
+from cooking.models import IngredientQuantity, Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает рендереры на странице рецептов: время рендеринга, '
+        'размер ответа и цену сжатия gzip.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes', type=int, default=10,
+            help='Сколько рецептов на странице (PAGE_SIZE по умолчанию).'
+        )
+        parser.add_argument('--rounds', type=int, default=500)
+        parser.add_argument('--gzip-level', type=int, default=6)
+
+    def handle(self, *args, **options):
+        data = self.sample_page(options['recipes'])
+        candidates = [('JSONRenderer (DRF)', JSONRenderer())]
+        if renderers.orjson is not None:
+            candidates.append(
+                ('FastJSONRenderer', renderers.FastJSONRenderer())
+            )
+        if renderers.msgpack is not None:
+            candidates.append(
+                ('MessagePackRenderer', renderers.MessagePackRenderer())
+            )
+
+        for name, renderer in candidates:
+            render_time = self.timed(
+                lambda: renderer.render(data), options['rounds']
+            )
+            payload = renderer.render(data)
+            compress_time = self.timed(
+                lambda: gzip.compress(payload, options['gzip_level']),
+                options['rounds'],
+            )
+            compressed = gzip.compress(payload, options['gzip_level'])
+            self.stdout.write(
+                f'{name}: {render_time:.1f} мкс, {len(payload)} байт; '
+                f'gzip: +{compress_time:.1f} мкс, {len(compressed)} байт'
+            )
+
+    @staticmethod
+    def sample_page(size: int):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = AnonymousUser()
+        recipes = (
+            Recipe.objects.select_related('author')
+            .prefetch_related('tags', Prefetch(
+                'ingredientquantity_set',
+                queryset=IngredientQuantity.objects.select_related(
+                    'ingredient'
+                )
+            ))[:size]
+        )
+        return {
+            'count': size,
+            'next': None,
+            'previous': None,
+            'results': RecipeSerializer(
+                recipes, many=True, context={'request': request}
+            ).data,
+        }
+
+    @staticmethod
+    def timed(func, rounds: int) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        return (time.perf_counter() - started) / rounds * 1e6
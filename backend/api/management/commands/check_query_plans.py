@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.query_plans import api_queries, full_scans, seed_dataset
+from cooking.models import Favorite
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет через EXPLAIN, что запросы горячих путей API читают '
+        'таблицы по индексу, а не целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Сколько рецептов сгенерировать перед проверкой. '
+                 'Данные удаляются откатом транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if full_scans('', '', connection.vendor) is None:
+            raise CommandError(
+                f'Разбор планов для {connection.vendor} не поддерживается.'
+            )
+        with transaction.atomic():
+            if options['seed']:
+                seed_dataset(options['seed'])
+            failures = self.check_plans()
+            transaction.set_rollback(True)
+        if failures:
+            raise CommandError(
+                'Полное чтение таблицы: ' + ', '.join(failures)
+            )
+
+    def check_plans(self):
+        sample = Favorite.objects.select_related('recipe').first()
+        if sample is None:
+            raise CommandError('Нет данных для проверки, задайте --seed.')
+
+        failures = []
+        for name, model, queryset in api_queries(sample.user, sample.recipe):
+            plan = queryset.explain()
+            failed = full_scans(plan, model._meta.db_table, connection.vendor)
+            if failed:
+                failures.append(name)
+            status = (self.style.ERROR('FAIL') if failed
+                      else self.style.SUCCESS('OK'))
+            self.stdout.write(f'{status} {name}')
+            if self.verbosity > 1:
+                self.stdout.write(plan)
+        return failures
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+# Загрузка WSGI-приложения так же, как её делает воркер gunicorn.
+STARTUP_SCRIPT = '''
+import os, resource, time
+started = time.perf_counter()
+from foodgram.wsgi import application
+print(time.perf_counter() - started)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Профиль холодного старта воркера: время импорта по модулям '
+        'и пакетам, общее время и память процесса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=15,
+            help='Сколько модулей и пакетов показать.'
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, WARMUP_ON_START='False')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            capture_output=True, text=True, env=env, check=True,
+        )
+        seconds, max_rss = result.stdout.split()[-2:]
+        modules, packages = self.parse(result.stderr)
+
+        self.stdout.write(
+            f'Старт приложения: {float(seconds) * 1000:.0f} мс, '
+            f'пиковая память {int(max_rss) / 1024:.1f} МБ, '
+            f'модулей импортировано: {len(modules)}'
+        )
+        self.stdout.write('\nМодули (с зависимостями), мс:')
+        for name, cumulative in sorted(
+                modules.items(), key=lambda item: -item[1]
+        )[:options['top']]:
+            self.stdout.write(f'{cumulative / 1000:9.1f}  {name}')
+        self.stdout.write('\nПакеты (собственное время), мс:')
+        for name, own in sorted(
+                packages.items(), key=lambda item: -item[1]
+        )[:options['top']]:
+            self.stdout.write(f'{own / 1000:9.1f}  {name}')
+
+    @staticmethod
+    def parse(importtime: str):
+        modules = {}
+        packages = defaultdict(int)
+        for line in importtime.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, cumulative, name = line[len('import time:'):].split('|')
+            name = name.strip()
+            modules[name] = int(cumulative)
+            packages[name.split('.')[0]] += int(own)
+        return modules, packages
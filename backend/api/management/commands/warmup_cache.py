@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from api.warmup import warmup
+from foodgram.constants import (WARMUP_PAGES, WARMUP_POPULAR_RECIPES,
+                                WARMUP_WORKERS)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет кеш каталогов тегов и ингредиентов, первых страниц '
+        'рецептов и самых популярных рецептов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=WARMUP_PAGES)
+        parser.add_argument(
+            '--popular', type=int, default=WARMUP_POPULAR_RECIPES
+        )
+        parser.add_argument('--workers', type=int, default=WARMUP_WORKERS)
+        parser.add_argument(
+            '--host', help='Host, с которым обращаются клиенты.'
+        )
+
+    def handle(self, *args, **options):
+        report = warmup(
+            pages=options['pages'],
+            popular=options['popular'],
+            workers=options['workers'],
+            host=options['host'],
+        )
+        self.stdout.write(str(report))
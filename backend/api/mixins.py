@@ -0,0 +1,156 @@
+import calendar
+import hashlib
+
+from django.db.models import prefetch_related_objects
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers, quote_etag)
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from foodgram.constants import RECIPE_LIST_MAX_AGE
+
+from .cache import cache_version, changed_at
+from .viewer import get_viewer
+
+
+class FieldsetMixin:
+    """Параметры fields= и expand= для сокращённого ответа.
+
+    Без fields отдаются все поля. Связи, перечисленные в fields, но не
+    в expand, сериализатор отдаёт первичными ключами. Разбор действует
+    только для чтения списка и объекта.
+    """
+    fieldset_actions = ('list', 'retrieve')
+
+    def requested_fields(self):
+        return self._query_param_set('fields')
+
+    def expanded_fields(self):
+        return self._query_param_set('expand') or set()
+
+    def wants_field(self, name: str) -> bool:
+        fields = self.requested_fields()
+        return fields is None or name in fields
+
+    def expands_field(self, name: str) -> bool:
+        return (self.requested_fields() is None
+                or name in self.expanded_fields())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.requested_fields()
+        context['expand'] = self.expanded_fields()
+        return context
+
+    def _query_param_set(self, name: str):
+        if self.action not in self.fieldset_actions:
+            return None
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return {field.strip() for field in value.split(',') if field.strip()}
+
+
+class ConditionalRecipeMixin:
+    """ETag, Last-Modified и Cache-Control для списка и карточки рецепта.
+
+    Валидаторы строятся из версий кеша, которые сигналы сдвигают при
+    изменении рецептов, авторов, тегов и ингредиентов, из updated_at
+    карточки и флагов зрителя, поэтому ответ 304 отдаётся до
+    сериализации и без запросов к таблице рецептов. Для авторизованных
+    запросов Last-Modified не отправляется: флаги избранного и корзины
+    меняются без изменения рецепта, и их учитывает только ETag.
+    """
+    list_namespace = 'recipes'
+    detail_namespace = 'catalogue'
+
+    def list(self, request, *args, **kwargs):
+        etag_parts = last_modified = None
+        if self.has_list_validators():
+            viewer_state = self.viewer_state(request)
+            if viewer_state is not None:
+                etag_parts = (
+                    request.get_full_path(),
+                    cache_version(self.list_namespace),
+                    viewer_state,
+                )
+            last_modified = changed_at(self.list_namespace)
+        return self.conditional_response(
+            request,
+            etag_parts=etag_parts,
+            last_modified=last_modified,
+            get_response=lambda: super(ConditionalRecipeMixin, self).list(
+                request, *args, **kwargs
+            ),
+            max_age=RECIPE_LIST_MAX_AGE,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        viewer = get_viewer(request)
+        return self.conditional_response(
+            request,
+            etag_parts=(
+                instance.pk, instance.updated_at,
+                cache_version(self.detail_namespace), request.user.pk,
+                viewer.has_favorite(instance.pk),
+                viewer.has_in_cart(instance.pk),
+                viewer.follows(instance.author_id),
+            ),
+            last_modified=max(
+                instance.updated_at, changed_at(self.detail_namespace)
+            ),
+            get_response=lambda: self.serialized_response(instance),
+        )
+
+    def has_list_validators(self) -> bool:
+        """Можно ли описать содержимое списка версией кеша."""
+        return True
+
+    def get_prefetch_lookups(self):
+        return ()
+
+    def serialized_response(self, instance):
+        prefetch_related_objects([instance], *self.get_prefetch_lookups())
+        return Response(self.get_serializer(instance).data)
+
+    @staticmethod
+    def viewer_state(request):
+        if request.user.is_anonymous:
+            return ()
+        viewer = get_viewer(request)
+        sets = (viewer.favorite_ids, viewer.cart_ids, viewer.following_ids)
+        if None in sets:
+            return None
+        return (request.user.pk, *(sorted(ids) for ids in sets))
+
+    @staticmethod
+    def conditional_response(request, etag_parts, last_modified,
+                             get_response, max_age=None):
+        anonymous = request.user.is_anonymous
+        etag = None
+        if etag_parts is not None:
+            etag = quote_etag(
+                hashlib.md5(repr(etag_parts).encode()).hexdigest()
+            )
+        timestamp = None
+        if anonymous and last_modified is not None:
+            timestamp = calendar.timegm(last_modified.utctimetuple())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = get_response()
+        if etag:
+            response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        patch_vary_headers(response, ('Authorization',))
+        if not anonymous:
+            patch_cache_control(response, private=True, no_cache=True)
+        elif max_age is not None:
+            patch_cache_control(response, public=True, max_age=max_age)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
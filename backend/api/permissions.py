@@ -1,10 +1,12 @@
 from rest_framework import permissions
 
+from .viewer import get_viewer
+
 
 class IsOwnerOrAcceptedMethods(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
-        return ((obj.author == request.user)
+        return (get_viewer(request).is_author_of(obj)
                 or request.method in tuple(permissions.SAFE_METHODS)
                 + ('POST',))
 
@@ -14,4 +16,4 @@ class IsAuthor(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.author == request.user
+        return get_viewer(request).is_author_of(obj)
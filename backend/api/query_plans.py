@@ -0,0 +1,113 @@
+import random
+import re
+
+from django.db import connection
+from django.db.models import Sum
+
+from cooking.models import (Cart, Favorite, Ingredient, IngredientQuantity,
+                            Recipe)
+from users.models import Subscribe, User
+
+SEED_PREFIX = 'plan-seed'
+SEED_INGREDIENTS_PER_RECIPE = 5
+SEED_LINKS_PER_USER = 20
+SEED_RECIPES_PER_USER = 20
+
+FULL_SCAN_PATTERNS = {
+    'postgresql': r'Seq Scan on {table}\b',
+    'sqlite': r'\bSCAN (?:TABLE )?{table}\b(?! USING)',
+}
+
+
+def api_queries(user, recipe):
+    """Запросы горячих путей API: (название, модель, queryset)."""
+    cart = Cart.objects.filter(user=user).values('recipe')
+    return (
+        ('Рецепты автора по дате', Recipe,
+         Recipe.objects.filter(author=recipe.author_id).order_by('pub_date')),
+        ('Избранное зрителя', Favorite,
+         Favorite.objects.filter(user=user).values_list('recipe_id')),
+        ('Корзина зрителя', Cart,
+         Cart.objects.filter(user=user).values_list('recipe_id')),
+        ('Рецепт в избранном', Favorite,
+         Favorite.objects.filter(user=user, recipe=recipe)),
+        ('Рецепт в корзине', Cart,
+         Cart.objects.filter(user=user, recipe=recipe)),
+        ('Подписки зрителя', Subscribe,
+         Subscribe.objects.filter(user=user).values_list('author_id')),
+        ('Ингредиенты рецепта', IngredientQuantity,
+         IngredientQuantity.objects.filter(recipe=recipe)),
+        ('Список покупок', IngredientQuantity,
+         IngredientQuantity.objects.filter(recipe__in=cart)
+         .values('ingredient').annotate(amount=Sum('amount'))),
+    )
+
+
+def full_scans(plan: str, table: str, vendor: str):
+    """True, если план читает таблицу целиком; None для других СУБД."""
+    pattern = FULL_SCAN_PATTERNS.get(vendor)
+    if pattern is None:
+        return None
+    return re.search(pattern.format(table=table), plan) is not None
+
+
+def seed_dataset(recipes: int):
+    """Заполняет базу данными для проверки планов.
+
+    Вызывается внутри транзакции, которую команда откатывает.
+    """
+    User.objects.bulk_create(
+        User(
+            username=f'{SEED_PREFIX}-{index}',
+            email=f'{SEED_PREFIX}-{index}@example.com',
+            first_name=SEED_PREFIX,
+            last_name=SEED_PREFIX,
+        )
+        for index in range(max(recipes // SEED_RECIPES_PER_USER, 2))
+    )
+    # SQLite не возвращает id из bulk_create, поэтому строки
+    # перечитываются.
+    users = list(User.objects.filter(username__startswith=SEED_PREFIX))
+    if not Ingredient.objects.exists():
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'{SEED_PREFIX}-{index}', measurement_unit='г')
+            for index in range(100)
+        )
+    ingredients = list(Ingredient.objects.all()[:1000])
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=users[index % len(users)],
+            name=f'{SEED_PREFIX}-{index}',
+            text=SEED_PREFIX,
+            cooking_time=1,
+        )
+        for index in range(recipes)
+    )
+    created = list(Recipe.objects.filter(name__startswith=SEED_PREFIX))
+
+    IngredientQuantity.objects.bulk_create(
+        IngredientQuantity(recipe=recipe, ingredient=ingredient, amount=1)
+        for recipe in created
+        for ingredient in random.sample(
+            ingredients, min(SEED_INGREDIENTS_PER_RECIPE, len(ingredients))
+        )
+    )
+    for model in (Favorite, Cart):
+        model.objects.bulk_create(
+            model(user=user, recipe=recipe)
+            for user in users
+            for recipe in random.sample(
+                created, min(SEED_LINKS_PER_USER, len(created))
+            )
+        )
+    Subscribe.objects.bulk_create(
+        Subscribe(user=user, author=author)
+        for user in users
+        for author in random.sample(
+            users, min(SEED_LINKS_PER_USER, len(users))
+        )
+        if author != user
+    )
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
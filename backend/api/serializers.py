@@ -1,13 +1,46 @@
+from functools import partial
+
 from django.db import IntegrityError, transaction
-from django.shortcuts import get_object_or_404
-from drf_extra_fields.fields import Base64ImageField
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.fields import CurrentUserDefault
-from rest_framework.validators import UniqueValidator
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 
-from cooking.models import (Cart, Favorite, Ingredient, IngredientQuantity,
+from cooking.models import (Ingredient, IngredientQuantity, MealPlanEntry,
                             Recipe, Tag)
-from users.models import Subscribe, User
+from foodgram.constants import MEAL_PLAN_MAX_DAYS, RECIPES_LIMIT_MAX
+from users.models import User
+
+from .fields import Base64ImageField
+from .viewer import get_viewer
+
+
+class FieldsetSerializerMixin:
+    """Поля ответа по context['fields'] и context['expand'].
+
+    Применяется только к сериализатору верхнего уровня: вложенные
+    сериализаторы получают тот же контекст, но не урезаются.
+    """
+    collapsed_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested is None or not self.is_top_level():
+            return fields
+        expand = self.context.get('expand', set())
+        return {
+            name: (self.collapsed_fields[name]()
+                   if name in self.collapsed_fields and name not in expand
+                   else field)
+            for name, field in fields.items() if name in requested
+        }
+
+    def is_top_level(self) -> bool:
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
 
 
 class AuthorSerializer(serializers.ModelSerializer):
@@ -19,11 +52,10 @@ class AuthorSerializer(serializers.ModelSerializer):
                   'last_name', 'is_subscribed',)
 
     def get_is_subscribed(self, obj) -> bool:
-        subscribe = Subscribe.objects.filter(
-            user=self.context['request'].user.id,
-            author=obj,
-        ).exists()
-        return subscribe
+        subscribed = getattr(obj, 'is_subscribed', None)
+        if subscribed is not None:
+            return subscribed
+        return get_viewer(self.context['request']).follows(obj.id)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -77,76 +109,101 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         fields = ('id', 'tags', 'author', 'ingredients',
                   'name', 'image', 'text', 'cooking_time',)
 
+    @transaction.atomic
     def create(self, validated_data):
-        tags_list = validated_data.pop('tags')
-        ingredients_list = validated_data.pop('ingredientquantity_set')
-        new_recipe = Recipe.objects.create(
-            author=validated_data.pop('author'),
-            name=validated_data.pop('name'),
-            image=validated_data.pop('image'),
-            text=validated_data.pop('text'),
-            cooking_time=validated_data.pop('cooking_time'),
-        )
-        new_recipe.tags.set(tags_list)
-        new_recipe.save()
-        new_recipe = self.add_ingredients(new_recipe, ingredients_list)
-
-        return new_recipe
+        tags = validated_data.pop('tags')
+        ingredients = validated_data.pop('ingredientquantity_set')
+        recipe = Recipe.objects.create(**validated_data)
+        recipe.tags.set(tags)
+        self.sync_ingredients(recipe, ingredients, new_recipe=True)
+        return recipe
 
     def validate(self, attrs):
-        ingredients = attrs.get('ingredientquantity_set', [])
-        tags = attrs.get('tags', [])
-        cooking_time = attrs.get('cooking_time')
-        image = attrs.get('image')
-        self.__validate_ingredients(ingredients)
-        self.__validate_tags(tags)
-        self.__validate_cooking_time(cooking_time)
-        self.__validate_image(image)
+        validators = {
+            'ingredientquantity_set': self.__validate_ingredients,
+            'tags': self.__validate_tags,
+            'cooking_time': self.__validate_cooking_time,
+            'image': self.__validate_image,
+        }
+        for name, validator in validators.items():
+            # При частичном обновлении проверяются только переданные поля.
+            if name in attrs or not self.partial:
+                validator(attrs.get(name))
 
         return attrs
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        tags_list = validated_data.pop('tags')
-        ingredients_list = validated_data.get('ingredientquantity_set', )
-        instance.name = validated_data.get('name', instance.name)
-        instance.image = validated_data.get('image', instance.image)
-        instance.text = validated_data.pop('text', instance.text)
-        instance.cooking_time = validated_data.pop(
-            'cooking_time', instance.cooking_time
-        )
-        instance.save()
-        instance.tags.clear()
-        instance.tags.set(tags_list)
-        instance.save()
-        instance = self.add_ingredients(instance, ingredients_list, True)
-        instance.save()
+        """Меняет только отличающиеся поля и строки связей.
+
+        Рецепт сохраняется один раз, если изменилось хоть что-то:
+        updated_at участвует в ETag и должен сдвинуться и тогда, когда
+        поменялись только теги или ингредиенты.
+        """
+        validated_data.pop('author', None)
+        tags = validated_data.pop('tags', None)
+        ingredients = validated_data.pop('ingredientquantity_set', None)
+
+        update_fields = []
+        for name, value in validated_data.items():
+            if getattr(instance, name) != value:
+                setattr(instance, name, value)
+                update_fields.append(name)
+
+        related_changed = False
+        if tags is not None:
+            related_changed |= self.sync_tags(instance, tags)
+        if ingredients is not None:
+            related_changed |= self.sync_ingredients(instance, ingredients)
+
+        if update_fields or related_changed:
+            instance.save(update_fields=[*update_fields, 'updated_at'])
         return instance
 
-    def add_ingredients(
-            self, recipe, ingredients: list or tuple,
-            clear_ingredients: bool = False
-    ):
-        if clear_ingredients:
-            recipe.ingredients.clear()
+    @staticmethod
+    def sync_tags(recipe, tags) -> bool:
+        current = set(recipe.tags.values_list('pk', flat=True))
+        wanted = {tag.pk for tag in tags}
+        if current - wanted:
+            recipe.tags.remove(*(current - wanted))
+        if wanted - current:
+            recipe.tags.add(*(wanted - current))
+        return current != wanted
+
+    @staticmethod
+    def sync_ingredients(recipe, ingredients, new_recipe=False) -> bool:
+        """Приводит ингредиенты рецепта к списку тремя bulk-запросами."""
+        wanted = {
+            item['ingredient']['id']: item['amount'] for item in ingredients
+        }
+        current = {} if new_recipe else {
+            row.ingredient_id: row
+            for row in IngredientQuantity.objects.filter(recipe=recipe)
+        }
 
-        recipe.save()
-
-        for ingredient in ingredients:
-            ingredient_description = get_object_or_404(
-                Ingredient, id=ingredient['ingredient']['id']
-            )
-            ingredient_quantity, created = (
-                IngredientQuantity.objects.get_or_create(
-                    ingredient=ingredient_description,
-                    defaults={'amount': abs(ingredient['amount'])},
-                    recipe=recipe,
-                )
-            )
-            if not created:
-                ingredient_quantity.amount += abs(ingredient['amount'])
-                ingredient_quantity.save()
-        recipe.save()
-        return recipe
+        stale = [
+            row.pk for ingredient_id, row in current.items()
+            if ingredient_id not in wanted
+        ]
+        changed = []
+        created = []
+        for ingredient_id, amount in wanted.items():
+            row = current.get(ingredient_id)
+            if row is None:
+                created.append(IngredientQuantity(
+                    recipe=recipe, ingredient_id=ingredient_id, amount=amount
+                ))
+            elif row.amount != amount:
+                row.amount = amount
+                changed.append(row)
+
+        if stale:
+            IngredientQuantity.objects.filter(pk__in=stale).delete()
+        if changed:
+            IngredientQuantity.objects.bulk_update(changed, ('amount',))
+        if created:
+            IngredientQuantity.objects.bulk_create(created)
+        return bool(stale or changed or created)
 
     def __validate_image(self, value):
         if not value:
@@ -175,31 +232,23 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         'абрикосовое пюре', 'measurement_unit': 'г'}),
         ('amount', 1)])
         """
-        count_ingredients = len(value)
-        if value is None or count_ingredients <= 0:
+        if not value:
             raise serializers.ValidationError(
                 'Не добавлено ни одного ингредиента.')
 
-        unique_ingredients = set()
+        ids = set()
         for item in value:
-
             if item['amount'] <= 0:
                 raise serializers.ValidationError(
                     'Количество в ингредиенте не может быть отрицательным.')
-            ingredient = item['ingredient']
+            ids.add(item['ingredient'].get('id'))
 
-            id_ = ingredient.get('id')
-            ingredient_entity = Ingredient.objects.filter(
-                pk=id_,
-            )
-            if not ingredient_entity.exists():
-                raise serializers.ValidationError(
-                    'Нет такого ингредиента!')
-            unique_ingredients.add(id_)
-
-        if len(unique_ingredients) != count_ingredients:
+        if len(ids) != len(value):
             raise serializers.ValidationError(
                 'Не уникальные ингредиенты!')
+        if Ingredient.objects.filter(pk__in=ids).count() != len(ids):
+            raise serializers.ValidationError(
+                'Нет такого ингредиента!')
         return value
 
     def unique_validator(self, value) -> bool:
@@ -211,10 +260,14 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         """Для приведения ответа к виду в соответствии с api."""
+        prefetch_related_objects([instance], 'tags', Prefetch(
+            'ingredientquantity_set',
+            queryset=IngredientQuantity.objects.select_related('ingredient')
+        ))
         return RecipeSerializer(instance, context=self.context).data
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     ingredients = IngredientRecipeSerializer(
         source='ingredientquantity_set', many=True, required=True
     )
@@ -224,6 +277,13 @@ class RecipeSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
 
+    collapsed_fields = {
+        'author': partial(serializers.PrimaryKeyRelatedField, read_only=True),
+        'tags': partial(
+            serializers.PrimaryKeyRelatedField, many=True, read_only=True
+        ),
+    }
+
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'ingredients',
@@ -231,18 +291,22 @@ class RecipeSerializer(serializers.ModelSerializer):
                   'text', 'cooking_time',)
 
     def get_is_favorited(self, obj):
-        is_favorited = Favorite.objects.filter(
-            user=self.context['request'].user.id,
-            recipe=obj.id,
-        ).exists()
-        return is_favorited
+        return get_viewer(self.context['request']).has_favorite(obj.id)
 
     def get_is_in_shopping_cart(self, obj):
-        is_in_shopping_cart = Cart.objects.filter(
-            user=self.context['request'].user.id,
-            recipe=obj.id,
-        ).exists()
-        return is_in_shopping_cart
+        return get_viewer(self.context['request']).has_in_cart(obj.id)
+
+
+def parse_recipes_limit(params):
+    """recipes_limit из запроса в пределах 0..RECIPES_LIMIT_MAX.
+
+    None, если параметр не передан или не число.
+    """
+    try:
+        limit = int(params.get('recipes_limit'))
+    except (TypeError, ValueError):
+        return None
+    return max(0, min(limit, RECIPES_LIMIT_MAX))
 
 
 class RecipeLinkedModelsSerializer(serializers.ModelSerializer):
@@ -252,6 +316,37 @@ class RecipeLinkedModelsSerializer(serializers.ModelSerializer):
         ordering = ['id']
 
 
+class UserProfileSerializer(AuthorSerializer):
+    """Профиль автора со счётчиками и превью последних рецептов.
+
+    Превью отдаётся, только если передан recipes_limit, и не длиннее
+    RECIPES_LIMIT_MAX.
+    """
+    recipes_count = serializers.IntegerField(read_only=True)
+    followers_count = serializers.IntegerField(read_only=True)
+
+    class Meta(AuthorSerializer.Meta):
+        fields = (*AuthorSerializer.Meta.fields,
+                  'recipes_count', 'followers_count',)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        limit = self.recipes_limit()
+        if limit:
+            recipes = (
+                instance.recipes.only('id', 'author', 'name', 'image',
+                                      'cooking_time')
+                .order_by('-pub_date')[:limit]
+            )
+            data['recipes'] = RecipeLinkedModelsSerializer(
+                recipes, many=True, context=self.context
+            ).data
+        return data
+
+    def recipes_limit(self) -> int:
+        return parse_recipes_limit(self.context['request'].query_params) or 0
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     class Meta:
         fields = (
@@ -285,7 +380,8 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class SubscribeListSerializer(serializers.Serializer):  # noqa
+class SubscribeListSerializer(FieldsetSerializerMixin,  # noqa
+                              serializers.Serializer):
     email = serializers.ReadOnlyField(source='author.email')
     id = serializers.ReadOnlyField(source='author.id')
     username = serializers.ReadOnlyField(source='author.username')
@@ -295,23 +391,84 @@ class SubscribeListSerializer(serializers.Serializer):  # noqa
     recipes = serializers.SerializerMethodField('get_recipes', read_only=True)
     recipes_count = serializers.SerializerMethodField(read_only=True)
 
+    collapsed_fields = {
+        'recipes': partial(
+            serializers.SerializerMethodField, 'get_recipe_ids'
+        ),
+    }
+
     def get_recipes_count(self, obj) -> int:
-        return obj.author.recipes.count()
+        count = getattr(obj, 'recipes_count', None)
+        if count is None:
+            count = obj.author.recipes.count()
+        return count
 
     def get_is_subscribed(self, obj) -> bool:
-        subscribe = Subscribe.objects.filter(
-            author=obj.author,
-            user=self.context['request'].user,
-        ).exists()
-        return subscribe
+        return get_viewer(self.context['request']).follows(obj.author_id)
 
     def get_recipes(self, obj) -> dict:
+        serializer = RecipeLinkedModelsSerializer(
+            instance=self.limited_recipes(obj), many=True
+        )
+        return serializer.data
+
+    def get_recipe_ids(self, obj) -> list:
+        return [recipe.pk for recipe in self.limited_recipes(obj)]
+
+    def limited_recipes(self, obj):
+        recipes = getattr(obj.author, 'recipes_preview', None)
+        if recipes is not None:
+            return recipes
         recipes_limit = (
-            self.context['view'].request.query_params.get('recipes_limit')
+            parse_recipes_limit(self.context['view'].request.query_params)
             if self.context else None
         )
-        recipes = (obj.author.recipes.all()[:int(recipes_limit)]
-                   if recipes_limit
-                   else obj.author.recipes.all())
-        serializer = RecipeLinkedModelsSerializer(instance=recipes, many=True)
-        return serializer.data
+        return (obj.author.recipes.all()[:recipes_limit]
+                if recipes_limit is not None
+                else obj.author.recipes.all())
+
+
+class MealPlanSerializer(serializers.ModelSerializer):
+    user = serializers.HiddenField(default=CurrentUserDefault())
+    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+
+    class Meta:
+        model = MealPlanEntry
+        fields = ('id', 'user', 'recipe', 'date', 'servings',)
+        validators = (
+            UniqueTogetherValidator(
+                queryset=MealPlanEntry.objects.all(),
+                fields=('user', 'date', 'recipe'),
+                message='Рецепт уже запланирован на этот день.'
+            ),
+        )
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['recipe'] = RecipeLinkedModelsSerializer(
+            instance.recipe, context=self.context
+        ).data
+        return data
+
+
+class DateRangeSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, attrs):
+        days = (attrs['end'] - attrs['start']).days + 1
+        if days < 1:
+            raise serializers.ValidationError(
+                'Конец периода раньше начала.')
+        if days > MEAL_PLAN_MAX_DAYS:
+            raise serializers.ValidationError(
+                f'Период не может быть длиннее {MEAL_PLAN_MAX_DAYS} дней.')
+        return attrs
+
+
+class ShoppingItemSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    amount = serializers.DecimalField(
+        max_digits=12, decimal_places=2, coerce_to_string=False
+    )
+    measurement_unit = serializers.CharField(source='unit')
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from cooking.models import Ingredient, IngredientQuantity, Recipe, Tag
+from users.models import Subscribe
+
+from .authentication import token_cache_key
+from .cache import bump_version, profile_namespace
+
+# Поля, которые меняются при входе и не попадают в ответы API.
+LOGIN_FIELDS = frozenset(('last_login', 'password'))
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender, instance, **kwargs):
+    keys = Token.objects.filter(user=instance).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and LOGIN_FIELDS.issuperset(update_fields):
+        return
+    bump_version('recipes', 'catalogue', profile_namespace(instance.pk))
+
+
+@receiver(post_save, sender=Subscribe)
+@receiver(post_delete, sender=Subscribe)
+def followers_changed(sender, instance, **kwargs):
+    bump_version(profile_namespace(instance.author_id))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def author_recipes_changed(sender, instance, **kwargs):
+    bump_version(profile_namespace(instance.author_id))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=IngredientQuantity)
+@receiver(post_delete, sender=IngredientQuantity)
+def recipe_changed(sender, **kwargs):
+    bump_version('recipes')
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version('recipes')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_version('tags', 'recipes', 'catalogue')
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    bump_version('ingredients', 'recipes', 'catalogue')
@@ -0,0 +1,130 @@
+"""Бюджет SQL-запросов и времени ответа для тестов API.
+
+QueryRecorder подключается через connection.execute_wrapper и для
+каждого запроса запоминает SQL, время выполнения и ближайшее к запросу
+место в коде проекта. Если бюджет превышен, тест падает с перечнем
+запросов, в котором повторы (признак N+1) видны сразу.
+"""
+import os
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class RecordedQuery(NamedTuple):
+    sql: str
+    params: tuple
+    duration: float
+    origin: str
+
+
+def is_application(path: str) -> bool:
+    return (
+        path.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in path
+        and not path.startswith(TESTS_DIR)
+        and os.path.basename(path) != 'manage.py'
+    )
+
+
+def is_database_layer(path: str) -> bool:
+    return path == __file__ or f'{os.sep}django{os.sep}db{os.sep}' in path
+
+
+def format_frame(frame) -> str:
+    path = frame.filename
+    if is_application(path):
+        path = os.path.relpath(path, settings.BASE_DIR)
+    else:
+        path = path.rsplit('site-packages' + os.sep, 1)[-1]
+    return f'{path}:{frame.lineno} ({frame.name})'
+
+
+def query_origin() -> str:
+    """Место в коде проекта, откуда выполнен запрос.
+
+    Если запрос выполнила библиотека (например, поле DRF), после
+    стрелки указан её ближайший к ORM кадр.
+    """
+    caller = None
+    for frame in reversed(traceback.extract_stack()):
+        if caller is None and not is_database_layer(frame.filename):
+            caller = frame
+        if is_application(frame.filename):
+            if frame is caller:
+                return format_frame(frame)
+            return f'{format_frame(frame)} -> {format_frame(caller)}'
+    return format_frame(caller) if caller else 'неизвестно'
+
+
+class QueryRecorder:
+    """Контекстный менеджер, записывающий запросы к базе."""
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.queries = []
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(RecordedQuery(
+                sql, tuple(params or ()), time.perf_counter() - started,
+                query_origin(),
+            ))
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def report(self) -> str:
+        repeated = Counter(query.sql for query in self.queries)
+        lines = []
+        for number, query in enumerate(self.queries, 1):
+            times = repeated[query.sql]
+            mark = f' повторяется {times} раз' if times > 1 else ''
+            lines.append(
+                f'{number}. {query.origin}, '
+                f'{query.duration * 1000:.1f} мс{mark}\n'
+                f'   {query.sql}\n'
+                f'   {query.params}'
+            )
+        return '\n'.join(lines)
+
+
+class QueryBudgetMixin:
+    """assertQueryBudget для TestCase."""
+
+    @contextmanager
+    def assertQueryBudget(self, queries: int, seconds: float = None):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recorder:
+            yield recorder
+        elapsed = time.perf_counter() - started
+        if len(recorder) > queries:
+            self.fail(
+                f'Выполнено {len(recorder)} запросов при бюджете '
+                f'{queries}:\n{recorder.report()}'
+            )
+        if seconds is not None and elapsed > seconds:
+            self.fail(
+                f'Ответ занял {elapsed:.3f} с при пределе {seconds} с, '
+                f'запросов: {len(recorder)}:\n{recorder.report()}'
+            )
@@ -0,0 +1,437 @@
+"""Бюджеты SQL-запросов и времени ответа для всех маршрутов api/urls.py.
+
+Данные засеваются так, чтобы страницы списков были заполнены, а у
+читателя были избранное, корзина, подписки и план питания: тогда
+N+1 в сериализаторах даёт лишние запросы на каждый объект страницы и
+сразу выходит за бюджет. Кеш очищается перед каждым тестом, поэтому
+бюджет считается для холодного кеша и включает проверку токена.
+"""
+import shutil
+import tempfile
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import URLPattern, URLResolver, resolve
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from cooking.models import (Cart, Favorite, Ingredient, IngredientQuantity,
+                            MealPlanEntry, Recipe, Tag)
+from cooking.recommendations import (build_similar_recipes,
+                                     build_user_recommendations)
+from users.models import Subscribe, User
+
+from .. import urls as api_urls
+from .query_budget import QueryBudgetMixin
+
+RESPONSE_TIME_LIMIT = 0.5
+MEDIA_ROOT = tempfile.mkdtemp()
+
+AUTHORS = 5
+RECIPES_PER_AUTHOR = 6
+INGREDIENTS_PER_RECIPE = 5
+READER_FAVORITES = 12
+READER_SUBSCRIPTIONS = 3
+
+PASSWORD = 'Budget-pass-42'
+# Однопиксельный PNG для создания и изменения рецепта.
+PIXEL = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAA'
+    'DUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+)
+
+# Наибольшее число запросов по имени маршрута из api/urls.py и методу.
+# Запросы авторизованного пользователя включают проверку токена.
+ROUTE_BUDGETS = {
+    'api-root': {'get': 0},
+    'login': {'post': 4},
+    'logout': {'post': 3},
+    'tags-list': {'get': 1},
+    'tags-detail': {'get': 1},
+    'ingredients-list': {'get': 1},
+    'ingredients-detail': {'get': 1},
+    'recipes-list': {'get': 11, 'post': 17},
+    'recipes-detail': {'get': 7, 'patch': 17, 'delete': 4},
+    'recipes-favorite': {'post': 5, 'delete': 5},
+    'recipes-shopping-cart': {'post': 5, 'delete': 5},
+    'recipes-similar': {'get': 2},
+    'recipes-recommended': {'get': 3},
+    'recipes-download-shopping-cart': {'get': 2},
+    'meal_plan-list': {'get': 3, 'post': 4},
+    'meal_plan-detail': {'get': 2, 'patch': 5, 'delete': 3},
+    'meal_plan-shopping-list': {'get': 2},
+    'users-list': {'get': 4, 'post': 6},
+    'users-detail': {'get': 2},
+    'users-subscribe': {'post': 7, 'delete': 4},
+    'subscriptions-list': {'get': 5},
+    'user-me': {'get': 2},
+    'user-set-password': {'post': 3},
+    'user-set-username': {'post': 4},
+    'user-activation': {'post': 1},
+    'user-resend-activation': {'post': 1},
+    'user-reset-password': {'post': 1},
+    'user-reset-password-confirm': {'post': 1},
+    'user-reset-username': {'post': 1},
+    'user-reset-username-confirm': {'post': 2},
+}
+# Маршруты djoser, которые перекрыты одноимёнными маршрутами роутера.
+SHADOWED_ROUTES = {'user-list', 'user-detail'}
+
+
+def route_names(patterns) -> set:
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def seed():
+    """Авторы с рецептами и читатель с избранным, корзиной и планом."""
+    tags = [
+        Tag.objects.create(name=f'Тег {number}', slug=f'tag-{number}',
+                           color=f'#00000{number}')
+        for number in range(3)
+    ]
+    ingredients = [
+        Ingredient.objects.create(
+            name=f'Ингредиент {number}', measurement_unit='г'
+        )
+        for number in range(AUTHORS * INGREDIENTS_PER_RECIPE)
+    ]
+    users = [
+        User.objects.create_user(
+            username=f'user{number}', email=f'user{number}@example.com',
+            first_name='Имя', last_name='Фамилия', password=PASSWORD,
+        )
+        for number in range(AUTHORS + 1)
+    ]
+    reader, authors = users[0], users[1:]
+    for user in users:
+        Token.objects.create(user=user)
+
+    recipes = []
+    for author_number, author in enumerate(authors):
+        for number in range(RECIPES_PER_AUTHOR):
+            recipe = Recipe.objects.create(
+                author=author, name=f'Рецепт {author_number}-{number}',
+                text='Описание', image='recipes/images/seed.png',
+                cooking_time=number + 1,
+            )
+            recipe.tags.set(tags[number % 2:number % 2 + 2])
+            IngredientQuantity.objects.bulk_create(
+                IngredientQuantity(
+                    recipe=recipe, ingredient=ingredient, amount=number + 1
+                )
+                for ingredient in ingredients[
+                    number:number + INGREDIENTS_PER_RECIPE
+                ]
+            )
+            recipes.append(recipe)
+
+    Favorite.objects.bulk_create(
+        Favorite(user=reader, recipe=recipe)
+        for recipe in recipes[:READER_FAVORITES]
+    )
+    Cart.objects.bulk_create(
+        Cart(user=reader, recipe=recipe)
+        for recipe in recipes[:READER_FAVORITES]
+    )
+    Favorite.objects.bulk_create(
+        Favorite(user=author, recipe=recipe)
+        for author in authors for recipe in recipes[::4]
+    )
+    Subscribe.objects.bulk_create(
+        Subscribe(user=reader, author=author)
+        for author in authors[:READER_SUBSCRIPTIONS]
+    )
+    today = date.today()
+    MealPlanEntry.objects.bulk_create(
+        MealPlanEntry(
+            user=reader, recipe=recipe,
+            date=today + timedelta(days=number % 3), servings=2,
+        )
+        for number, recipe in enumerate(recipes[:6])
+    )
+    build_similar_recipes()
+    build_user_recommendations()
+    return reader, authors, recipes
+
+
+# Бюджет считает запросы приложения: кеш в памяти процесса не
+# добавляет своих запросов, как это делает кеш в таблице базы. Токены
+# в таком кеше не хранятся, так что проверка токена — всегда запрос.
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }},
+    MEDIA_ROOT=MEDIA_ROOT,
+)
+class RouteQueryBudgetTests(QueryBudgetMixin, APITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader, cls.authors, cls.recipes = seed()
+        cls.author = cls.authors[0]
+        cls.recipe = cls.recipes[0]
+        cls.plan_entry = MealPlanEntry.objects.filter(user=cls.reader).first()
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, user=None) -> APIClient:
+        client = APIClient()
+        if user is not None:
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=user)}'
+            )
+        return client
+
+    def check(self, route, method, url, user=None, data=None,
+              status_code=status.HTTP_200_OK, budget=None):
+        """Запрос к маршруту route в пределах его бюджета."""
+        self.assertEqual(resolve(urlsplit(url).path).url_name, route)
+        client = self.client_for(user)
+        if budget is None:
+            budget = ROUTE_BUDGETS[route][method]
+        with self.assertQueryBudget(budget, RESPONSE_TIME_LIMIT):
+            if method == 'get':
+                response = client.get(url, data)
+            else:
+                response = getattr(client, method)(url, data, format='json')
+        self.assertEqual(
+            response.status_code, status_code, response.content[:500]
+        )
+        return response
+
+    def test_every_route_has_budget(self):
+        self.assertEqual(
+            route_names(api_urls.urlpatterns) - SHADOWED_ROUTES,
+            set(ROUTE_BUDGETS),
+        )
+
+    def test_api_root(self):
+        self.check('api-root', 'get', '/api/')
+
+    def test_login_and_logout(self):
+        response = self.check(
+            'login', 'post', '/api/auth/token/login/',
+            data={'email': self.reader.email, 'password': PASSWORD},
+        )
+        self.assertIn('auth_token', response.data)
+        self.check(
+            'logout', 'post', '/api/auth/token/logout/', user=self.reader,
+            status_code=status.HTTP_204_NO_CONTENT,
+        )
+
+    def test_tags(self):
+        self.check('tags-list', 'get', '/api/tags/')
+        tag = Tag.objects.first()
+        self.check('tags-detail', 'get', f'/api/tags/{tag.pk}/')
+
+    def test_ingredients(self):
+        self.check('ingredients-list', 'get', '/api/ingredients/')
+        self.check(
+            'ingredients-list', 'get', '/api/ingredients/',
+            data={'name': 'Ингр'},
+        )
+        ingredient = Ingredient.objects.first()
+        self.check(
+            'ingredients-detail', 'get', f'/api/ingredients/{ingredient.pk}/'
+        )
+
+    def test_recipes_list(self):
+        response = self.check('recipes-list', 'get', '/api/recipes/')
+        self.assertEqual(len(response.data['results']), 10)
+        self.check('recipes-list', 'get', '/api/recipes/', user=self.reader)
+        # Бюджет не зависит от размера страницы.
+        response = self.check(
+            'recipes-list', 'get', '/api/recipes/', user=self.reader,
+            data={'limit': len(self.recipes)},
+        )
+        self.assertEqual(len(response.data['results']), len(self.recipes))
+        self.check(
+            'recipes-list', 'get', '/api/recipes/', user=self.reader,
+            data={'is_favorited': 1, 'is_in_shopping_cart': 1,
+                  'tags': 'tag-1', 'author': self.author.pk},
+        )
+        self.check(
+            'recipes-list', 'get', '/api/recipes/',
+            data={'fields': 'id,name,author', 'expand': 'author'},
+        )
+
+    def test_recipes_list_cached(self):
+        self.check('recipes-list', 'get', '/api/recipes/')
+        self.check('recipes-list', 'get', '/api/recipes/', budget=0)
+
+    def test_recipe_detail(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        self.check('recipes-detail', 'get', url)
+        self.check('recipes-detail', 'get', url, user=self.reader)
+
+    def test_recipe_create_update_delete(self):
+        tags = list(Tag.objects.values_list('pk', flat=True)[:2])
+        ingredients = [
+            {'id': pk, 'amount': 10}
+            for pk in Ingredient.objects.values_list('pk', flat=True)[:5]
+        ]
+        payload = {
+            'ingredients': ingredients, 'tags': tags, 'image': PIXEL,
+            'name': 'Новый рецепт', 'text': 'Описание', 'cooking_time': 10,
+        }
+        response = self.check(
+            'recipes-list', 'post', '/api/recipes/', user=self.author,
+            data=payload, status_code=status.HTTP_201_CREATED,
+        )
+        url = f'/api/recipes/{response.data["id"]}/'
+        self.check(
+            'recipes-detail', 'patch', url, user=self.author,
+            data={'name': 'Другое название',
+                  'ingredients': ingredients[1:]},
+        )
+        self.check(
+            'recipes-detail', 'delete', url, user=self.author,
+            status_code=status.HTTP_204_NO_CONTENT,
+        )
+
+    def test_favorite_and_shopping_cart(self):
+        recipe = self.recipes[-1]
+        for route, action in (
+            ('recipes-favorite', 'favorite'),
+            ('recipes-shopping-cart', 'shopping_cart'),
+        ):
+            url = f'/api/recipes/{recipe.pk}/{action}/'
+            self.check(route, 'post', url, user=self.reader,
+                       status_code=status.HTTP_201_CREATED)
+            self.check(route, 'delete', url, user=self.reader,
+                       status_code=status.HTTP_204_NO_CONTENT)
+
+    def test_similar_and_recommended(self):
+        self.check(
+            'recipes-similar', 'get', f'/api/recipes/{self.recipe.pk}/similar/'
+        )
+        self.check(
+            'recipes-recommended', 'get', '/api/recipes/recommended/',
+            user=self.reader,
+        )
+
+    def test_download_shopping_cart(self):
+        self.check(
+            'recipes-download-shopping-cart', 'get',
+            '/api/recipes/download_shopping_cart/', user=self.reader,
+        )
+
+    def test_meal_plan(self):
+        self.check('meal_plan-list', 'get', '/api/meal_plan/',
+                   user=self.reader)
+        self.check(
+            'meal_plan-list', 'post', '/api/meal_plan/', user=self.reader,
+            data={'recipe': self.recipes[-1].pk, 'date': str(date.today()),
+                  'servings': 3},
+            status_code=status.HTTP_201_CREATED,
+        )
+        url = f'/api/meal_plan/{self.plan_entry.pk}/'
+        self.check('meal_plan-detail', 'get', url, user=self.reader)
+        self.check('meal_plan-detail', 'patch', url, user=self.reader,
+                   data={'servings': 4})
+        self.check('meal_plan-detail', 'delete', url, user=self.reader,
+                   status_code=status.HTTP_204_NO_CONTENT)
+
+    def test_meal_plan_shopping_list(self):
+        period = {'start': str(date.today()),
+                  'end': str(date.today() + timedelta(days=6))}
+        response = self.check(
+            'meal_plan-shopping-list', 'get', '/api/meal_plan/shopping_list/',
+            user=self.reader, data=period,
+        )
+        self.assertTrue(response.data)
+
+    def test_users(self):
+        self.check('users-list', 'get', '/api/users/')
+        self.check('users-list', 'get', '/api/users/', user=self.reader)
+        self.check(
+            'users-list', 'post', '/api/users/',
+            data={'email': 'new@example.com', 'username': 'new_user',
+                  'first_name': 'Имя', 'last_name': 'Фамилия',
+                  'password': PASSWORD},
+            status_code=status.HTTP_201_CREATED,
+        )
+
+    def test_user_profile(self):
+        url = f'/api/users/{self.author.pk}/'
+        self.check('users-detail', 'get', url, data={'recipes_limit': 3})
+        self.check('users-detail', 'get', url, user=self.reader)
+
+    def test_me(self):
+        self.check('user-me', 'get', '/api/users/me/', user=self.reader)
+
+    def test_subscribe(self):
+        url = f'/api/users/{self.authors[-1].pk}/subscribe/'
+        self.check('users-subscribe', 'post', url, user=self.reader,
+                   status_code=status.HTTP_201_CREATED)
+        self.check('users-subscribe', 'delete', url, user=self.reader,
+                   status_code=status.HTTP_204_NO_CONTENT)
+
+    def test_subscriptions(self):
+        response = self.check(
+            'subscriptions-list', 'get', '/api/users/subscriptions/',
+            user=self.reader, data={'recipes_limit': 3},
+        )
+        self.assertEqual(len(response.data['results']), READER_SUBSCRIPTIONS)
+        self.check(
+            'subscriptions-list', 'get', '/api/users/subscriptions/',
+            user=self.reader, data={'fields': 'id,recipes_count'},
+        )
+
+    def test_set_password(self):
+        self.check(
+            'user-set-password', 'post', '/api/users/set_password/',
+            user=self.reader,
+            data={'current_password': PASSWORD,
+                  'new_password': 'Another-pass-42'},
+            status_code=status.HTTP_204_NO_CONTENT,
+        )
+
+    def test_set_email(self):
+        self.check(
+            'user-set-username', 'post', '/api/users/set_email/',
+            user=self.reader,
+            data={'current_password': PASSWORD,
+                  'new_email': 'reader@example.com'},
+            status_code=status.HTTP_204_NO_CONTENT,
+        )
+
+    def test_account_recovery(self):
+        bad_token = {'uid': 'MQ', 'token': 'invalid'}
+        for route, url, data, status_code in (
+            ('user-activation', '/api/users/activation/', bad_token,
+             status.HTTP_400_BAD_REQUEST),
+            ('user-resend-activation', '/api/users/resend_activation/',
+             {'email': self.reader.email}, status.HTTP_400_BAD_REQUEST),
+            ('user-reset-password', '/api/users/reset_password/',
+             {'email': self.reader.email}, status.HTTP_204_NO_CONTENT),
+            ('user-reset-password-confirm',
+             '/api/users/reset_password_confirm/',
+             {**bad_token, 'new_password': PASSWORD},
+             status.HTTP_400_BAD_REQUEST),
+            ('user-reset-username', '/api/users/reset_email/',
+             {'email': self.reader.email}, status.HTTP_204_NO_CONTENT),
+            ('user-reset-username-confirm',
+             '/api/users/reset_email_confirm/',
+             {**bad_token, 'new_email': 'other@example.com'},
+             status.HTTP_400_BAD_REQUEST),
+        ):
+            with self.subTest(route=route):
+                self.check(route, 'post', url, data=data,
+                           status_code=status_code)
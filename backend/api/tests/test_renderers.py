@@ -0,0 +1,51 @@
+"""Согласование формата ответа: JSON и MessagePack дают одни данные."""
+import json
+
+import msgpack
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from cooking.models import Ingredient, IngredientQuantity, Recipe, Tag
+from users.models import User
+
+RECIPES = 3
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+}})
+class MessagePackRendererTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='author', email='author@example.com',
+            first_name='Имя', last_name='Фамилия', password='Msgpack-42',
+        )
+        tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        ingredient = Ingredient.objects.create(
+            name='Мука', measurement_unit='г'
+        )
+        for number in range(RECIPES):
+            recipe = Recipe.objects.create(
+                author=author, name=f'Рецепт {number}', text='Описание',
+                image='recipes/images/seed.png', cooking_time=number + 1,
+            )
+            recipe.tags.add(tag)
+            IngredientQuantity.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=number + 1
+            )
+
+    def test_recipe_page_round_trips(self):
+        as_json = self.client.get(
+            '/api/recipes/', HTTP_ACCEPT='application/json'
+        )
+        as_msgpack = self.client.get(
+            '/api/recipes/', HTTP_ACCEPT='application/msgpack'
+        )
+        self.assertEqual(as_msgpack.status_code, status.HTTP_200_OK)
+        self.assertEqual(as_msgpack['Content-Type'], 'application/msgpack')
+        data = msgpack.unpackb(as_msgpack.content, raw=False)
+        self.assertEqual(len(data['results']), RECIPES)
+        self.assertEqual(data, json.loads(as_json.content))
@@ -0,0 +1,49 @@
+from django.core.cache import caches
+from rest_framework.throttling import ScopedRateThrottle
+
+from foodgram.constants import THROTTLE_CACHE_ALIAS
+
+
+class TokenBucketThrottle(ScopedRateThrottle):
+    """Ограничение частоты по throttle_scope представления.
+
+    Вместо списка времён запросов, как у ScopedRateThrottle, в кеше
+    хранится одно число — теоретическое время следующего запроса
+    (GCRA, эквивалент ведра токенов ёмкостью num_requests). Проверка
+    стоит одного get и одного set.
+
+    Счётчики живут в кеше THROTTLE_CACHE_ALIAS, по умолчанию в memcached,
+    общем для всех воркеров. В dbcache каждый set стоит нескольких
+    запросов к базе, включая COUNT(*) по таблице кеша, поэтому он для
+    счётчиков не годится. При locmemcache у каждого процесса
+    свои счётчики, и предел умножается на число воркеров. Гонка между
+    get и set может пропустить лишний запрос, но не заблокировать
+    клиента.
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    @property
+    def cache(self):
+        return caches[THROTTLE_CACHE_ALIAS]
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        now = self.timer()
+        interval = self.duration / self.num_requests
+        arrival = max(self.cache.get(key, now), now) + interval
+        self.wait_time = arrival - now - self.duration
+        if self.wait_time > 0:
+            return False
+        self.cache.set(key, arrival, int(arrival - now) + 1)
+        return True
+
+    def wait(self):
+        return max(self.wait_time, 0)
@@ -2,8 +2,8 @@ from django.conf.urls import url
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (IngredientViewSet, RecipeViewSet, SubscriptionsListSet,
-                    TagViewSet, UserSet)
+from .views import (IngredientViewSet, MealPlanViewSet, RecipeViewSet,
+                    SubscriptionsListSet, TagViewSet, TokenLoginView, UserSet)
 
 app_name = 'api'
 
@@ -12,13 +12,15 @@ router = DefaultRouter()
 router.register(r'^tags', TagViewSet, basename='tags')
 router.register(r'^ingredients', IngredientViewSet, basename='ingredients')
 router.register(r'^recipes', RecipeViewSet, basename='recipes')
+router.register(r'^meal_plan', MealPlanViewSet, basename='meal_plan')
 router.register(r'^users', UserSet, basename='users')
-router.register(r'^users/(?P<user_id>\d+)', UserSet, basename='users')
 router.register(
     r'^users/subscriptions', SubscriptionsListSet, basename='subscriptions'
 )
 
 urlpatterns = [
+    # Раньше djoser, чтобы вход шёл через представление с ограничением.
+    url(r'^auth/token/login/?$', TokenLoginView.as_view(), name='login'),
     path('', include(router.urls)),
     url('', include('djoser.urls')),
     url('auth/', include('djoser.urls.authtoken')),
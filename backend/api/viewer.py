@@ -0,0 +1,77 @@
+from django.utils.functional import cached_property
+
+from cooking.models import Cart, Favorite
+from foodgram.constants import VIEWER_CONTEXT_MAX_IDS
+from users.models import Subscribe
+
+
+def get_viewer(request) -> 'ViewerContext':
+    """Контекст зрителя, один на запрос.
+
+    Хранится на HttpRequest, поэтому общий для разрешений, всех
+    сериализаторов и вложенных представлений в рамках запроса.
+    """
+    request = getattr(request, '_request', request)
+    viewer = getattr(request, 'viewer', None)
+    if viewer is None or viewer.user != request.user:
+        viewer = request.viewer = ViewerContext(request.user)
+    return viewer
+
+
+class ViewerContext:
+    """Избранное, корзина и подписки текущего пользователя.
+
+    Каждый набор id загружается одним запросом при первом обращении.
+    Если у пользователя больше VIEWER_CONTEXT_MAX_IDS записей, набор
+    не хранится и проверка выполняется запросом по конкретному объекту.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def is_author_of(self, obj) -> bool:
+        return obj.author_id == self.user.pk
+
+    @cached_property
+    def favorite_ids(self):
+        return self._load_ids(Favorite.objects, 'recipe_id')
+
+    @cached_property
+    def cart_ids(self):
+        return self._load_ids(Cart.objects, 'recipe_id')
+
+    @cached_property
+    def following_ids(self):
+        return self._load_ids(Subscribe.objects, 'author_id')
+
+    def has_favorite(self, recipe_id: int) -> bool:
+        return self._contains(
+            self.favorite_ids, Favorite.objects, 'recipe_id', recipe_id
+        )
+
+    def has_in_cart(self, recipe_id: int) -> bool:
+        return self._contains(
+            self.cart_ids, Cart.objects, 'recipe_id', recipe_id
+        )
+
+    def follows(self, author_id: int) -> bool:
+        return self._contains(
+            self.following_ids, Subscribe.objects, 'author_id', author_id
+        )
+
+    def _load_ids(self, manager, field: str):
+        if self.user.is_anonymous:
+            return frozenset()
+        ids = list(
+            manager.filter(user=self.user)
+            .order_by()
+            .values_list(field, flat=True)[:VIEWER_CONTEXT_MAX_IDS + 1]
+        )
+        if len(ids) > VIEWER_CONTEXT_MAX_IDS:
+            return None
+        return frozenset(ids)
+
+    def _contains(self, ids, manager, field: str, value: int) -> bool:
+        if ids is not None:
+            return value in ids
+        return manager.filter(user=self.user, **{field: value}).exists()
@@ -1,29 +1,57 @@
 import csv
 
 import django_filters.rest_framework
-from django.db.models import Sum
+from django.db.models import (Count, Exists, IntegerField, OuterRef, Prefetch,
+                              Q, Subquery, Sum)
+from django.db.models.functions import Coalesce
 from django.http import HttpResponse
-from django.http.response import JsonResponse
 from django.shortcuts import get_object_or_404
+from djoser.views import TokenCreateView
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.response import Response
 
+from cooking.meal_plan import shopping_rows
 from cooking.models import (Cart, Favorite, Ingredient, IngredientQuantity,
-                            Recipe, Tag)
+                            MealPlanEntry, Recipe, Tag)
+from cooking.units import format_amount, merge_amounts
+from foodgram.constants import CATALOG_MAX_AGE, RECIPE_LIST_MAX_AGE
 from users.models import Subscribe, User
+from .cache import ResponseCacheMixin, profile_namespace
 from .filters import CustomIngredientsFilter, RecipeFilter
+from .mixins import ConditionalRecipeMixin, FieldsetMixin
 from .paginators import CustomPagination
 from .permissions import IsOwnerOrAcceptedMethods, IsAuthor
-from .serializers import (AuthorSerializer, IngredientSerializer,
+from .serializers import (AuthorSerializer, DateRangeSerializer,
+                          IngredientSerializer, MealPlanSerializer,
                           RecipeCreateSerializer, RecipeLinkedModelsSerializer,
-                          RecipeSerializer, SubscribeListSerializer,
-                          TagSerializer, UserCreateSerializer)
+                          RecipeSerializer, ShoppingItemSerializer,
+                          SubscribeListSerializer, TagSerializer,
+                          UserCreateSerializer, UserProfileSerializer,
+                          parse_recipes_limit)
+
+RECIPE_COLUMNS = ('name', 'image', 'text', 'cooking_time')
+RECIPE_PREVIEW_COLUMNS = ('name', 'image', 'cooking_time')
+
+
+def count_subquery(model, field: str):
+    """Число строк model, у которых field указывает на текущую строку."""
+    rows = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(FieldsetMixin, ResponseCacheMixin, ConditionalRecipeMixin,
+                    viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
+    cache_namespace = 'recipes'
+    throttle_scope = None
     filter_backends = (django_filters.rest_framework.DjangoFilterBackend,)
     filterset_class = RecipeFilter
     pagination_class = CustomPagination
@@ -38,28 +66,66 @@ class RecipeViewSet(viewsets.ModelViewSet):
             return RecipeCreateSerializer
         return RecipeSerializer
 
-    def patch(self, request, pk):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        serializer = RecipeCreateSerializer(recipe, data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(
-                status=status.HTTP_201_CREATED,
-                data=serializer.data
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.fieldset_actions:
+            return queryset
+
+        fields = self.requested_fields()
+        if fields is not None:
+            queryset = queryset.only(
+                'id', 'author', 'updated_at',
+                *(name for name in RECIPE_COLUMNS if name in fields)
             )
-        return Response(
-            status=status.HTTP_400_BAD_REQUEST,
-            data="wrong parameters"
+        if self.wants_field('author') and self.expands_field('author'):
+            queryset = queryset.select_related('author')
+        if self.action == 'list':
+            queryset = queryset.prefetch_related(
+                *self.get_prefetch_lookups()
+            )
+        return queryset
+
+    def get_ordering_field(self):
+        return RecipeFilter.ORDERING_FIELDS.get(
+            self.request.query_params.get('ordering')
         )
 
+    def get_cache_timeout(self):
+        # Рейтинги меняются без сброса кеша, поэтому живут недолго.
+        if self.get_ordering_field():
+            return RECIPE_LIST_MAX_AGE
+        return super().get_cache_timeout()
+
+    def has_list_validators(self):
+        # Рейтинги меняются без сдвига версии, поэтому такой список
+        # только кешируется ненадолго.
+        return not self.get_ordering_field()
+
+    def get_prefetch_lookups(self):
+        lookups = []
+        if self.wants_field('tags'):
+            lookups.append('tags')
+        if self.wants_field('ingredients'):
+            lookups.append(Prefetch(
+                'ingredientquantity_set',
+                queryset=IngredientQuantity.objects.select_related(
+                    'ingredient'
+                )
+            ))
+        return lookups
+
+    def perform_destroy(self, instance):
+        # Связанные строки удаляет фоновая задача cooking.purge.
+        instance.soft_delete()
+
     @action(detail=True, permission_classes=[permissions.IsAuthenticated],
-            methods=['post', 'delete'])
+            methods=['post', 'delete'], throttle_scope='recipe_links')
     def shopping_cart(self, request, pk=None):
         kwargs = self.do_action_with_model(request, pk, 'cart')
         return Response(**kwargs)
 
     @action(detail=True, permission_classes=[permissions.IsAuthenticated],
-            methods=['post', 'delete'])
+            methods=['post', 'delete'], throttle_scope='recipe_links')
     def favorite(self, request, pk=None):
         kwargs = self.do_action_with_model(request, pk, 'favorite')
         return Response(**kwargs)
@@ -108,16 +174,46 @@ class RecipeViewSet(viewsets.ModelViewSet):
         model_with_recipe.delete()
         return {'status': status.HTTP_204_NO_CONTENT}
 
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        recipe = self.get_object()
+        recipes = (
+            Recipe.objects.filter(similar_to__recipe=recipe)
+            .order_by('-similar_to__score')
+        )
+        serializer = RecipeLinkedModelsSerializer(
+            recipes, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
     @action(detail=False, permission_classes=[permissions.IsAuthenticated])
+    def recommended(self, request):
+        recipes = (
+            Recipe.objects.filter(recommended_to__user=request.user)
+            .order_by('-recommended_to__score')
+        )
+        page = self.paginate_queryset(recipes)
+        serializer = RecipeLinkedModelsSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, permission_classes=[permissions.IsAuthenticated],
+            throttle_scope='shopping_list')
     def download_shopping_cart(self, request):
         user_cart = (
-            Cart.objects.filter(user=request.user)
+            Cart.objects.filter(
+                user=request.user, recipe__deleted_at__isnull=True
+            )
             .values_list('recipe', flat=True)
         )
-        ingredients = (
+        rows = (
             IngredientQuantity.objects.filter(recipe__id__in=user_cart)
             .values('ingredient__name', 'ingredient__measurement_unit')
-            .annotate(amounts=Sum('amount')).all()
+            .annotate(amounts=Sum('amount'))
+            .values_list(
+                'ingredient__name', 'ingredient__measurement_unit', 'amounts'
+            )
         )
         response = HttpResponse(
             content_type='text/csv',
@@ -128,17 +224,19 @@ class RecipeViewSet(viewsets.ModelViewSet):
         )
 
         writer = csv.writer(response)
-        for ing in ingredients:
+        for item in merge_amounts(rows):
             writer.writerow(
-                [str(ing['ingredient__name']),
-                 str(ing['amounts']),
-                 str(ing['ingredient__measurement_unit'])]
+                [item.name, format_amount(item.amount), item.unit]
             )
         return response
 
 
-class IngredientViewSet(ListAPIView, RetrieveAPIView, viewsets.GenericViewSet):
+class IngredientViewSet(ResponseCacheMixin, ListAPIView, RetrieveAPIView,
+                        viewsets.GenericViewSet):
     queryset = Ingredient.objects.all()
+    cache_namespace = 'ingredients'
+    cache_authenticated = True
+    public_max_age = CATALOG_MAX_AGE
     serializer_class = IngredientSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     filter_backends = (django_filters.rest_framework.DjangoFilterBackend,)
@@ -146,49 +244,63 @@ class IngredientViewSet(ListAPIView, RetrieveAPIView, viewsets.GenericViewSet):
     pagination_class = None
 
 
-class TagViewSet(ListAPIView, RetrieveAPIView, viewsets.GenericViewSet):
+class TagViewSet(ResponseCacheMixin, ListAPIView, RetrieveAPIView,
+                 viewsets.GenericViewSet):
     queryset = Tag.objects.all()
+    cache_namespace = 'tags'
+    cache_authenticated = True
+    public_max_age = CATALOG_MAX_AGE
     serializer_class = TagSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     pagination_class = None
 
 
-class UserSet(mixins.ListModelMixin,
+class UserSet(ResponseCacheMixin,
+              mixins.ListModelMixin,
+              mixins.RetrieveModelMixin,
               mixins.CreateModelMixin,
               viewsets.GenericViewSet):
     permission_classes = (permissions.AllowAny,)
     serializer_class = AuthorSerializer
     pagination_class = CustomPagination
+    throttle_scope = None
+    # Нечисловые адреса (me, subscriptions) обрабатывают другие маршруты.
+    lookup_value_regex = r'\d+'
 
     def get_serializer_class(self):
         if self.action in {'create'}:
             return UserCreateSerializer
+        if self.action == 'retrieve':
+            return UserProfileSerializer
         return AuthorSerializer
 
     def get_queryset(self):
-        user_id = self.kwargs.get('user_id')
-        if user_id:
-            return get_object_or_404(User, id=user_id)
         queryset = User.objects.all()
-        return queryset
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        if isinstance(queryset, User):
-            serializer = self.get_serializer(queryset)
-            return JsonResponse(serializer.data)
+        if self.action != 'retrieve':
+            return queryset
 
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        # Профиль со всеми счётчиками читается одним запросом.
+        queryset = queryset.annotate(
+            recipes_count=count_subquery(Recipe, 'author'),
+            followers_count=count_subquery(Subscribe, 'author'),
+        )
+        if self.request.user.is_authenticated:
+            queryset = queryset.annotate(is_subscribed=Exists(
+                Subscribe.objects.filter(
+                    author=OuterRef('pk'), user=self.request.user
+                )
+            ))
+        return queryset
 
-        serializer = self.get_serializer(queryset, many=True)
-        return JsonResponse(serializer.data)
+    def get_cache_namespace(self):
+        # Кешируется только профиль, и у каждого автора своя версия.
+        if self.action == 'retrieve':
+            return profile_namespace(self.kwargs[self.lookup_field])
+        return None
 
     @action(detail=True,
             permission_classes=[permissions.IsAuthenticated, IsAuthor],
-            methods=['delete', 'post'])
+            methods=['delete', 'post'], throttle_scope='subscribe')
     def subscribe(self, request, pk=None):
         author = get_object_or_404(User, pk=pk)
         if request.method == 'DELETE':
@@ -227,11 +339,84 @@ class UserSet(mixins.ListModelMixin,
         return {'status': status.HTTP_204_NO_CONTENT}
 
 
-class SubscriptionsListSet(viewsets.GenericViewSet, mixins.ListModelMixin):
+class SubscriptionsListSet(FieldsetMixin, viewsets.GenericViewSet,
+                           mixins.ListModelMixin):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = SubscribeListSerializer
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        queryset = Subscribe.objects.filter(user=self.request.user)
+        queryset = (
+            Subscribe.objects.filter(user=self.request.user)
+            .select_related('author')
+            .order_by('pk')
+        )
+        if self.wants_field('recipes_count'):
+            queryset = queryset.annotate(
+                recipes_count=Count(
+                    'author__recipes',
+                    filter=Q(author__recipes__deleted_at__isnull=True),
+                )
+            )
+        if self.wants_field('recipes'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'author__recipes',
+                queryset=self.preview_recipes(),
+                to_attr='recipes_preview'
+            ))
         return queryset
+
+    def preview_recipes(self):
+        recipes = Recipe.objects.only(
+            'id', 'author',
+            *(RECIPE_PREVIEW_COLUMNS if self.expands_field('recipes') else ())
+        )
+        recipes_limit = parse_recipes_limit(self.request.query_params)
+        if recipes_limit is not None:
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(author=OuterRef('author'))
+                .values('pk')[:recipes_limit]
+            ))
+        return recipes
+
+
+class MealPlanViewSet(viewsets.ModelViewSet):
+    """План питания: рецепты по датам с числом порций.
+
+    Список можно ограничить параметрами start и end.
+    """
+    serializer_class = MealPlanSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = CustomPagination
+    throttle_scope = None
+
+    def get_queryset(self):
+        queryset = (
+            MealPlanEntry.objects.filter(
+                user=self.request.user, recipe__deleted_at__isnull=True
+            )
+            .select_related('recipe')
+        )
+        if self.action == 'list':
+            params = self.request.query_params
+            if params.get('start'):
+                queryset = queryset.filter(date__gte=params['start'])
+            if params.get('end'):
+                queryset = queryset.filter(date__lte=params['end'])
+        return queryset
+
+    @action(detail=False, throttle_scope='shopping_list')
+    def shopping_list(self, request):
+        period = DateRangeSerializer(data=request.query_params)
+        period.is_valid(raise_exception=True)
+        items = merge_amounts(shopping_rows(
+            request.user, **period.validated_data
+        ))
+        return Response({
+            **period.data,
+            'items': ShoppingItemSerializer(items, many=True).data,
+        })
+
+
+class TokenLoginView(TokenCreateView):
+    throttle_scope = 'login'
@@ -0,0 +1,81 @@
+"""Прогрев кеша ответов API после деплоя."""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+
+from cooking.models import Recipe
+from foodgram.constants import (PAGE_SIZE, WARMUP_PAGES,
+                                WARMUP_POPULAR_RECIPES, WARMUP_WORKERS)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupReport:
+    total: int
+    warmed: int
+    seconds: float
+
+    def __str__(self):
+        return (f'Прогрето {self.warmed} из {self.total} адресов '
+                f'за {self.seconds:.2f} с.')
+
+
+def default_host() -> str:
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+    return hosts[0].lstrip('.') if hosts else 'localhost'
+
+
+def warmup_urls(pages: int = WARMUP_PAGES,
+                popular: int = WARMUP_POPULAR_RECIPES) -> list:
+    urls = ['/api/tags/', '/api/ingredients/']
+    pages = min(pages, math.ceil(Recipe.objects.count() / PAGE_SIZE))
+    urls += [f'/api/recipes/?page={page}' for page in range(1, pages + 1)]
+    recipe_ids = (
+        Recipe.objects.order_by('-popularity', '-pk')
+        .values_list('pk', flat=True)[:popular]
+    )
+    urls += [f'/api/recipes/{pk}/' for pk in recipe_ids]
+    return urls
+
+
+def fetch(url: str, host: str) -> bool:
+    try:
+        return Client(HTTP_HOST=host).get(url).status_code == 200
+    except Exception:
+        logger.exception('Не удалось прогреть %s', url)
+        return False
+    finally:
+        connection.close()
+
+
+def warmup(pages: int = WARMUP_PAGES, popular: int = WARMUP_POPULAR_RECIPES,
+           workers: int = WARMUP_WORKERS, host: str = None) -> WarmupReport:
+    """Запрашивает адреса пулом из workers потоков.
+
+    Ответы попадают в кеш через ResponseCacheMixin, поэтому прогрев
+    из отдельного процесса полезен только при общем кеше (CACHE_URL);
+    LocMemCache каждого воркера прогревается хуком при старте.
+    """
+    host = host or default_host()
+    started = time.monotonic()
+    urls = warmup_urls(pages, popular)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        warmed = sum(pool.map(lambda url: fetch(url, host), urls))
+    return WarmupReport(len(urls), warmed, time.monotonic() - started)
+
+
+def warmup_in_background() -> threading.Thread:
+    def run():
+        logger.info('%s', warmup())
+
+    thread = threading.Thread(target=run, name='cache-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -1,49 +1,120 @@
 from django.contrib import admin
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.template.defaultfilters import truncatechars
 
-from .models import Cart, Favorite, Ingredient, IngredientQuantity, Recipe, Tag
+from foodgram.constants import ADMIN_TEXT_PREVIEW
+from foodgram.paginators import EstimatedCountPaginator
+
+from .models import (Cart, Favorite, Ingredient, IngredientQuantity,
+                     MealPlanEntry, Recipe, RecipeArchive, Tag)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Общие настройки для списков, которые растут вместе с базой."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(LargeTableAdmin):
     list_display = ('user', 'recipe',)
-    empty_value_display = '-пусто-'
+    list_select_related = ('user', 'recipe__author',)
+    autocomplete_fields = ('user', 'recipe',)
 
 
 @admin.register(IngredientQuantity)
-class IngredientInRecipeAdmin(admin.ModelAdmin):
+class IngredientInRecipeAdmin(LargeTableAdmin):
     list_display = ('pk', 'recipe', 'ingredient', 'amount',)
-    empty_value_display = '-пусто-'
+    list_select_related = ('recipe__author', 'ingredient',)
+    autocomplete_fields = ('recipe', 'ingredient',)
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'author',
         'name',
-        'image',
-        'text',
+        'short_text',
         'cooking_time',
         'in_favorite_count',
     )
-    empty_value_display = '-пусто-'
-    search_fields = ('name', 'author__username', 'tags',)
+    list_select_related = ('author',)
+    list_filter = ('tags',)
+    autocomplete_fields = ('author', 'tags',)
+    search_fields = ('name', '=author__username',)
+
+    def get_queryset(self, request):
+        favorites = (
+            Favorite.objects.filter(recipe=OuterRef('pk'))
+            .order_by()
+            .values('recipe')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return super().get_queryset(request).annotate(
+            favorites_count=Coalesce(
+                Subquery(favorites, output_field=IntegerField()), 0
+            )
+        )
+
+    def delete_model(self, request, obj):
+        obj.soft_delete()
+
+    def delete_queryset(self, request, queryset):
+        for recipe in queryset:
+            recipe.soft_delete()
+
+    @admin.display(description='Рецепт')
+    def short_text(self, obj):
+        return truncatechars(obj.text, ADMIN_TEXT_PREVIEW)
+
+    @admin.display(
+        description='Добавили в избранное', ordering='favorites_count'
+    )
+    def in_favorite_count(self, obj):
+        return obj.favorites_count
+
+
+@admin.register(RecipeArchive)
+class RecipeArchiveAdmin(LargeTableAdmin):
+    list_display = ('recipe_id', 'author', 'name', 'deleted_at',
+                    'archived_at',)
+    list_select_related = ('author',)
+    search_fields = ('=recipe_id', 'name',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ('pk', 'name', 'color', 'slug',)
     empty_value_display = '-пусто-'
+    search_fields = ('name', 'slug',)
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(LargeTableAdmin):
     list_display = ('pk', 'name', 'measurement_unit',)
-    empty_value_display = '-пусто-'
-    search_fields = ('name',)
+    search_fields = ('^name',)
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'user',)
-    empty_value_display = '-пусто-'
+class CartAdmin(LargeTableAdmin):
+    list_display = ('pk', 'user', 'recipe',)
+    list_select_related = ('user', 'recipe__author',)
+    autocomplete_fields = ('user', 'recipe',)
+
+
+@admin.register(MealPlanEntry)
+class MealPlanEntryAdmin(LargeTableAdmin):
+    list_display = ('pk', 'user', 'date', 'recipe', 'servings',)
+    list_select_related = ('user', 'recipe__author',)
+    list_filter = ('date',)
+    autocomplete_fields = ('user', 'recipe',)
@@ -5,3 +5,6 @@ class CookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cooking'
     verbose_name = 'Управление едой, ингредиентами, рецептами.'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from cooking.purge import archive_inactive
+from foodgram.constants import (RECIPE_ARCHIVE_INACTIVE_DAYS,
+                                RECIPE_PURGE_BATCH_SIZE, RECIPE_PURGE_CHUNK)
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит в архив рецепты, которые не менялись --days дней и '
+        'которых нет ни в избранном, ни в корзинах, ни в планах питания.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=float, default=RECIPE_ARCHIVE_INACTIVE_DAYS,
+            help='Сколько дней рецепт не менялся.'
+        )
+        parser.add_argument(
+            '--chunk', type=int, default=RECIPE_PURGE_CHUNK,
+            help='Рецептов за один проход.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=RECIPE_PURGE_BATCH_SIZE,
+            help='Связанных строк в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        inactive_for = timedelta(days=options['days'])
+        total = 0
+        while True:
+            archived = archive_inactive(
+                inactive_for, options['chunk'], options['batch_size']
+            )
+            total += archived
+            if archived < options['chunk']:
+                break
+        self.stdout.write(f'Перенесено в архив рецептов: {total}.')
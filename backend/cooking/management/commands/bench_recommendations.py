@@ -0,0 +1,83 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from cooking.recommendations import content_neighbors, cooccurrence_neighbors
+from foodgram.constants import (RECOMMENDATIONS_MAX_USER_ITEMS,
+                                RECOMMENDATIONS_TOP_K)
+
+
+def zipf_choice(rng: random.Random, population: int, size: int) -> set:
+    """size разных чисел из range(population), малые выпадают чаще."""
+    chosen = set()
+    while len(chosen) < size:
+        chosen.add(int(population ** rng.random()) - 1)
+    return chosen
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет расчёт соседей cooking.recommendations на синтетических '
+        'данных без базы: совместное избранное и сходство по ингредиентам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--favorites', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--recipes', type=int, default=50_000)
+        parser.add_argument('--ingredients', type=int, default=2_000)
+        parser.add_argument('--tags', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--top-k', type=int, default=RECOMMENDATIONS_TOP_K
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        recipes, users = options['recipes'], options['users']
+        top_k = options['top_k']
+
+        # Длина списка избранного тоже распределена неравномерно: у
+        # большинства несколько рецептов, у немногих — сотни.
+        user_items = {}
+        left = options['favorites']
+        for user_id in range(users):
+            if left <= 0:
+                break
+            mean = left / (users - user_id)
+            size = min(
+                left, RECOMMENDATIONS_MAX_USER_ITEMS, recipes,
+                max(1, int(rng.expovariate(1 / mean))),
+            )
+            user_items[user_id] = zipf_choice(rng, recipes, size)
+            left -= size
+        favorites = sum(len(items) for items in user_items.values())
+        self.measure(
+            f'Совместное избранное ({favorites} строк, '
+            f'{len(user_items)} пользователей)',
+            cooccurrence_neighbors, user_items, top_k * 5,
+        )
+
+        recipe_ingredients = {
+            recipe_id: zipf_choice(
+                rng, options['ingredients'], rng.randint(3, 12)
+            )
+            for recipe_id in range(recipes)
+        }
+        recipe_tags = {
+            recipe_id: {rng.randrange(options['tags'])}
+            for recipe_id in range(recipes)
+        }
+        self.measure(
+            f'Сходство по ингредиентам ({recipes} рецептов)',
+            content_neighbors, recipe_ingredients, recipe_tags, top_k,
+        )
+
+    def measure(self, title, function, *args):
+        started = time.perf_counter()
+        neighbors = function(*args)
+        self.stdout.write(
+            f'{title}: {time.perf_counter() - started:.1f} с, '
+            f'соседи у {len(neighbors)} рецептов'
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cooking.recommendations import (build_similar_recipes,
+                                     build_user_recommendations)
+from foodgram.constants import RECOMMENDATIONS_TOP_K
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие рецепты и рекомендации пользователям. '
+        'Запускается каждую ночь из infra/crontab.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k', type=int, default=RECOMMENDATIONS_TOP_K,
+            help='Сколько соседей хранить для рецепта и пользователя.'
+        )
+
+    def handle(self, *args, **options):
+        top_k = options['top_k']
+        for title, build in (
+                ('Похожие рецепты', build_similar_recipes),
+                ('Рекомендации', build_user_recommendations),
+        ):
+            started = time.monotonic()
+            created = build(top_k)
+            self.stdout.write(
+                f'{title}: {created} записей '
+                f'за {time.monotonic() - started:.1f} с.'
+            )
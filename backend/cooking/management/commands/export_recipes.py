@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from cooking.transfer import export_to
+from foodgram.constants import TRANSFER_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает теги, рецепты с ингредиентами и избранное в NDJSON. '
+        'Файл с расширением .gz сжимается. Картинки не выгружаются: '
+        'каталог MEDIA_ROOT/recipes/images копируется отдельно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки, например a.ndjson.gz')
+        parser.add_argument(
+            '--batch-size', type=int, default=TRANSFER_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        count = export_to(options['path'], options['batch_size'])
+        self.stdout.write(f'Выгружено записей: {count}.')
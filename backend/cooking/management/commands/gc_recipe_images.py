@@ -0,0 +1,69 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cooking.models import Recipe, RecipeArchive
+from foodgram.constants import MEDIA_GC_GRACE_HOURS
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы фото рецептов, на которые не ссылается ни один '
+        'рецепт, в том числе удалённый или архивный. Файлы моложе '
+        '--grace-hours не трогаются: их могла записать ещё не '
+        'завершённая транзакция.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=MEDIA_GC_GRACE_HOURS,
+            help='Минимальный возраст удаляемого файла в часах.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать файлы, которые будут удалены.'
+        )
+
+    def handle(self, *args, **options):
+        field = Recipe._meta.get_field('image')
+        storage = field.storage
+        # Фото удалённых и архивных рецептов тоже остаются на диске.
+        referenced = set(
+            Recipe.all_objects.exclude(image='')
+            .values_list('image', flat=True)
+            .iterator()
+        )
+        referenced.update(
+            RecipeArchive.objects.exclude(image='')
+            .values_list('image', flat=True)
+            .iterator()
+        )
+        deadline = timezone.now() - timedelta(hours=options['grace_hours'])
+
+        removed = kept = 0
+        for name in self.walk(storage, field.upload_to):
+            if name in referenced:
+                kept += 1
+                continue
+            if storage.get_modified_time(name) > deadline:
+                kept += 1
+                continue
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+            removed += 1
+
+        action = 'К удалению' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{action} файлов: {removed}, оставлено: {kept}.')
+
+    def walk(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        directories, files = storage.listdir(directory)
+        for name in files:
+            yield os.path.join(directory, name)
+        for name in directories:
+            yield from self.walk(storage, os.path.join(directory, name))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_version
+from cooking.meal_plan import forget_all
+from cooking.popularity import reconcile_popularity
+from cooking.transfer import RecipeImporter
+from foodgram.constants import TRANSFER_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_recipes. Существующие рецепты '
+        'обновляются, новые создаются. Пользователи должны уже быть '
+        'в базе, картинки рецептов переносятся отдельно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки, например a.ndjson.gz')
+        parser.add_argument(
+            '--batch-size', type=int, default=TRANSFER_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        stats = RecipeImporter(options['batch_size']).load(options['path'])
+        # bulk-операции не отправляют сигналы, поэтому производные
+        # данные пересчитываются, а версии кешей сдвигаются здесь. До
+        # воркеров сдвиг доходит только через общий кеш; в кеше процесса
+        # их записи доживают свой короткий срок.
+        if stats['favorite']:
+            reconcile_popularity()
+        forget_all()
+        bump_version('tags', 'recipes', 'catalogue')
+        self.stdout.write(
+            'Загружено тегов: {tag}, рецептов: {recipe}, избранного: '
+            '{favorite}. Пропущено: {skipped}. Теги, чьё название уже '
+            'занято другим slug: {tag_conflicts}.'.format(**stats)
+        )
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from cooking.purge import purge_expired
+from foodgram.constants import (RECIPE_PURGE_BATCH_SIZE, RECIPE_PURGE_CHUNK,
+                                RECIPE_PURGE_DELAY_HOURS)
+
+
+class Command(BaseCommand):
+    help = (
+        'Окончательно удаляет рецепты, помеченные удалёнными раньше '
+        '--older-than-hours часов назад, и сохраняет их снимки в архив.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-hours', type=float,
+            default=RECIPE_PURGE_DELAY_HOURS,
+            help='Сколько часов рецепт хранится после удаления.'
+        )
+        parser.add_argument(
+            '--chunk', type=int, default=RECIPE_PURGE_CHUNK,
+            help='Рецептов за один проход.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=RECIPE_PURGE_BATCH_SIZE,
+            help='Связанных строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--no-archive', action='store_false', dest='archive',
+            default=None, help='Удалять без сохранения в архив.'
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(hours=options['older_than_hours'])
+        total = 0
+        while True:
+            purged = purge_expired(
+                older_than, options['chunk'], options['archive'],
+                options['batch_size'],
+            )
+            total += purged
+            if purged < options['chunk']:
+                break
+        self.stdout.write(f'Удалено рецептов: {total}.')
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from cooking.popularity import decay_trending, reconcile_popularity
+from foodgram.constants import TRENDING_DECAY_INTERVAL_MINUTES
+
+
+class Command(BaseCommand):
+    help = (
+        'Затухание рейтинга в тренде. Запускается по расписанию из '
+        'infra/crontab с периодом --interval минут.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=TRENDING_DECAY_INTERVAL_MINUTES,
+            help='Сколько минут прошло с прошлого запуска.'
+        )
+        parser.add_argument(
+            '--reconcile', action='store_true',
+            help='Пересчитать популярность по избранному и корзинам.'
+        )
+
+    def handle(self, *args, **options):
+        decayed = decay_trending(options['interval'])
+        self.stdout.write(f'Затухание применено к {decayed} рецептам.')
+        if options['reconcile']:
+            fixed = reconcile_popularity()
+            self.stdout.write(f'Исправлена популярность {fixed} рецептов.')
@@ -0,0 +1,85 @@
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import F, Sum
+
+from foodgram.cache import shared_timeout
+from foodgram.constants import MEAL_PLAN_CACHE_TIMEOUT
+
+from .models import MealPlanEntry
+
+VERSION_KEY = 'meal-plan-version'
+
+
+def plan_version() -> int:
+    """Версия кеша планов, читается один раз на вызов.
+
+    После потери ключа версия начинается с текущего времени и не
+    совпадает с выданными раньше.
+    """
+    return cache.get_or_set(VERSION_KEY, time.time_ns, shared_timeout(None))
+
+
+def day_cache_key(version: int, user_id: int, day) -> str:
+    return f'meal-plan:{version}:{user_id}:{day.isoformat()}'
+
+
+def forget_days(pairs) -> None:
+    """Сбрасывает кеш дней плана по парам (user_id, date)."""
+    version = plan_version()
+    cache.delete_many(
+        [day_cache_key(version, user_id, day) for user_id, day in pairs]
+    )
+
+
+def forget_all() -> None:
+    cache.set(VERSION_KEY, time.time_ns(), shared_timeout(None))
+
+
+def date_range(start, end):
+    return [start + timedelta(days=offset)
+            for offset in range((end - start).days + 1)]
+
+
+def shopping_rows(user, start, end) -> list:
+    """Строки (название, единица, количество) за период с учётом порций.
+
+    Свод по каждому дню считается в SQL одним запросом для всех дней,
+    которых нет в кеше, и кешируется отдельно, поэтому изменение одного
+    дня не пересчитывает остальные.
+    """
+    days = date_range(start, end)
+    version = plan_version()
+    keys = {day: day_cache_key(version, user.pk, day) for day in days}
+    cached = cache.get_many(keys.values())
+    missing = [day for day in days if keys[day] not in cached]
+
+    if missing:
+        fresh = {day: [] for day in missing}
+        rows = (
+            MealPlanEntry.objects.filter(
+                user=user,
+                date__in=missing,
+                recipe__deleted_at__isnull=True,
+                recipe__ingredientquantity__isnull=False,
+            )
+            .order_by()
+            .values_list(
+                'date',
+                'recipe__ingredientquantity__ingredient__name',
+                'recipe__ingredientquantity__ingredient__measurement_unit',
+            )
+            .annotate(amount=Sum(
+                F('recipe__ingredientquantity__amount') * F('servings')
+            ))
+        )
+        for day, name, unit, amount in rows:
+            fresh[day].append((name, unit, amount))
+        cache.set_many(
+            {keys[day]: value for day, value in fresh.items()},
+            shared_timeout(MEAL_PLAN_CACHE_TIMEOUT),
+        )
+        cached.update((keys[day], value) for day, value in fresh.items())
+
+    return [row for day in days for row in cached[keys[day]]]
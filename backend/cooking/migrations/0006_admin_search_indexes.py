@@ -0,0 +1,36 @@
+from django.db import migrations
+
+INDEXES = (
+    ('cooking_recipe_name_trgm',
+     'CREATE INDEX IF NOT EXISTS cooking_recipe_name_trgm '
+     'ON cooking_recipe USING gin (name gin_trgm_ops)'),
+    ('cooking_ingredient_name_upper_like',
+     'CREATE INDEX IF NOT EXISTS cooking_ingredient_name_upper_like '
+     'ON cooking_ingredient (UPPER(name) varchar_pattern_ops)'),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for _, sql in INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooking', '0005_recommendations'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:34
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_popularity(apps, schema_editor):
+    Recipe = apps.get_model('cooking', 'Recipe')
+    recipes = Recipe.objects.annotate(
+        favorites_count=Count('favorites', distinct=True),
+        cart_count=Count('in_cart', distinct=True),
+    ).only('id')
+    for recipe in recipes.iterator():
+        popularity = recipe.favorites_count + recipe.cart_count
+        if popularity:
+            Recipe.objects.filter(pk=recipe.pk).update(
+                popularity=popularity, trending_score=popularity
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooking', '0007_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='popularity',
+            field=models.PositiveIntegerField(default=0, verbose_name='Популярность'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='trending_score',
+            field=models.FloatField(default=0, verbose_name='Рейтинг в тренде'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-popularity', '-id'], name='recipe_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-trending_score', '-id'], name='recipe_trending_idx'),
+        ),
+        migrations.RunPython(backfill_popularity, migrations.RunPython.noop),
+    ]
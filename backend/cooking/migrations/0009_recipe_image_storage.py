@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:43
+
+from django.db import migrations, models
+import foodgram.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooking', '0008_recipe_popularity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(storage=foodgram.storage.recipe_image_storage, upload_to='recipes/images', verbose_name='Фото блюда'),
+        ),
+    ]
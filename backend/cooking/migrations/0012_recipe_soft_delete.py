@@ -0,0 +1,59 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cooking', '0011_meal_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipe_id', models.PositiveIntegerField(unique=True, verbose_name='id рецепта')),
+                ('name', models.CharField(max_length=200, verbose_name='Название блюда')),
+                ('text', models.TextField(verbose_name='Рецепт')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Фото блюда')),
+                ('cooking_time', models.PositiveSmallIntegerField(verbose_name='Время приготовления')),
+                ('tags', models.JSONField(default=list, verbose_name='Теги')),
+                ('ingredients', models.JSONField(default=list, verbose_name='Ингредиенты')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('deleted_at', models.DateTimeField(verbose_name='Дата удаления')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата архивации')),
+            ],
+            options={
+                'verbose_name': 'Архивный рецепт',
+                'verbose_name_plural': 'Архив рецептов',
+                'ordering': ('-archived_at',),
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='recipe',
+            name='unique_for_author',
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='recipe_deleted_at_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipe',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted_at__isnull', True)), fields=('name', 'author'), name='unique_for_author'),
+        ),
+        migrations.AddField(
+            model_name='recipearchive',
+            name='author',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_recipes', to=settings.AUTH_USER_MODEL, verbose_name='Автор рецепта'),
+        ),
+    ]
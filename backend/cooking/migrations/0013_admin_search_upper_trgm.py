@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Поиск админки по icontains в PostgreSQL сравнивает
+# UPPER("name"::text) LIKE UPPER(%s), поэтому индекс по самому столбцу
+# не используется; нужен индекс по тому же выражению.
+INDEXES = (
+    ('cooking_recipe_name_upper_trgm',
+     'CREATE INDEX IF NOT EXISTS cooking_recipe_name_upper_trgm '
+     'ON cooking_recipe USING gin (UPPER(name::text) gin_trgm_ops)',
+     'cooking_recipe_name_trgm',
+     'CREATE INDEX IF NOT EXISTS cooking_recipe_name_trgm '
+     'ON cooking_recipe USING gin (name gin_trgm_ops)'),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for _, sql, old_name, _ in INDEXES:
+        schema_editor.execute(sql)
+        schema_editor.execute(f'DROP INDEX IF EXISTS {old_name}')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _, old_sql in INDEXES:
+        schema_editor.execute(old_sql)
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooking', '0012_recipe_soft_delete'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,10 +1,11 @@
 from colorfield.fields import ColorField
-from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from foodgram.constants import SLICE_NAME_INGREDIENT, SLICE_NAME_TAG
+from foodgram.storage import recipe_image_storage
 
 User = get_user_model()
 
@@ -58,6 +59,13 @@ class Ingredient(models.Model):
         return self.name[:SLICE_NAME_INGREDIENT]
 
 
+class ActiveRecipeManager(models.Manager):
+    """Рецепты без отметки об удалении."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -72,6 +80,7 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='recipes/images',
+        storage=recipe_image_storage,
         verbose_name='Фото блюда'
     )
     text = models.TextField(verbose_name='Рецепт')
@@ -99,24 +108,69 @@ class Recipe(models.Model):
         auto_now_add=True,
         db_index=True,
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+        db_index=True,
+    )
+    popularity = models.PositiveIntegerField(
+        verbose_name='Популярность',
+        default=0,
+    )
+    trending_score = models.FloatField(
+        verbose_name='Рейтинг в тренде',
+        default=0,
+    )
+    deleted_at = models.DateTimeField(
+        verbose_name='Дата удаления',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    objects = ActiveRecipeManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ('pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = (
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='recipe_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('-popularity', '-id'),
+                name='recipe_popularity_idx'
+            ),
+            models.Index(
+                fields=('-trending_score', '-id'),
+                name='recipe_trending_idx'
+            ),
+            # Очередь на окончательное удаление, только помеченные строки.
+            models.Index(
+                fields=('deleted_at',),
+                name='recipe_deleted_at_idx',
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        )
+        # Удалённый рецепт не мешает создать новый с тем же названием.
         constraints = (
             models.UniqueConstraint(
                 fields=('name', 'author'),
                 name='unique_for_author',
+                condition=models.Q(deleted_at__isnull=True),
             ),
         )
 
     def __str__(self):
         return f'{self.name}. {self.author.username}'
 
-    @admin.display(description='Добавили в избранное')
-    def in_favorite_count(self):
-        return self.favorites.count()
+    def soft_delete(self):
+        """Скрывает рецепт; связанные строки удалит фоновая задача."""
+        self.deleted_at = timezone.now()
+        self.save(update_fields=('deleted_at', 'updated_at'))
 
 
 class IngredientQuantity(models.Model):
@@ -138,6 +192,13 @@ class IngredientQuantity(models.Model):
     class Meta:
         verbose_name = 'Количество ингредиента в рецепте'
         verbose_name_plural = 'Количество инргредиентов в рецепте'
+        # Покрывающий индекс: список покупок читает amount без таблицы.
+        indexes = (
+            models.Index(
+                fields=('recipe', 'ingredient', 'amount'),
+                name='ingredientquantity_cover_idx'
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=['recipe', 'ingredient'],
@@ -201,3 +262,153 @@ class Cart(models.Model):
 
     def __str__(self):
         return f'{self.pk}'
+
+
+class SimilarRecipe(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similar_recipes',
+        verbose_name='Рецепт'
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similar_to',
+        verbose_name='Похожий рецепт'
+    )
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        indexes = (
+            models.Index(
+                fields=('recipe', '-score'),
+                name='similar_recipe_score_idx'
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('recipe', 'similar'),
+                name='unique_similar_recipe'
+            ),
+        )
+
+
+class RecommendedRecipe(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Пользователь'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='recommended_to',
+        verbose_name='Рецепт'
+    )
+    score = models.FloatField(verbose_name='Оценка')
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        indexes = (
+            models.Index(
+                fields=('user', '-score'),
+                name='recommended_user_score_idx'
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_user_recommendation'
+            ),
+        )
+
+
+class MealPlanEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='meal_plan',
+        verbose_name='Пользователь'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='meal_plan_entries',
+        verbose_name='Рецепт'
+    )
+    date = models.DateField(verbose_name='Дата')
+    servings = models.PositiveSmallIntegerField(
+        verbose_name='Порции',
+        default=1,
+        validators=[MinValueValidator(1)]
+    )
+
+    class Meta:
+        ordering = ('date', 'pk')
+        verbose_name = 'План питания'
+        verbose_name_plural = 'План питания'
+        # Уникальный индекс начинается с (user, date) и обслуживает
+        # выборку плана за период.
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'date', 'recipe'),
+                name='unique_meal_plan_entry'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.date}: {self.recipe.name} x{self.servings}'
+
+
+class RecipeArchive(models.Model):
+    """Снимок окончательно удалённого рецепта.
+
+    Таблица только пополняется и не участвует в запросах API, поэтому
+    история не увеличивает таблицы активных рецептов.
+    """
+    recipe_id = models.PositiveIntegerField(
+        unique=True,
+        verbose_name='id рецепта'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='archived_recipes',
+        verbose_name='Автор рецепта'
+    )
+    name = models.CharField(
+        max_length=200,
+        verbose_name='Название блюда'
+    )
+    text = models.TextField(verbose_name='Рецепт')
+    image = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Фото блюда'
+    )
+    cooking_time = models.PositiveSmallIntegerField(
+        verbose_name='Время приготовления'
+    )
+    tags = models.JSONField(default=list, verbose_name='Теги')
+    ingredients = models.JSONField(default=list, verbose_name='Ингредиенты')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    deleted_at = models.DateTimeField(verbose_name='Дата удаления')
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата архивации'
+    )
+
+    class Meta:
+        ordering = ('-archived_at',)
+        verbose_name = 'Архивный рецепт'
+        verbose_name_plural = 'Архив рецептов'
+
+    def __str__(self):
+        return self.name
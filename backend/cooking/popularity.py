@@ -0,0 +1,48 @@
+"""Популярность рецептов по избранному и корзинам.
+
+popularity — число добавлений в избранное и корзины, trending_score —
+та же величина с экспоненциальным затуханием. Оба поля меняются
+атомарными UPDATE при событиях и хранятся в индексированных колонках,
+поэтому сортировка по ним не требует агрегации.
+"""
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from foodgram.constants import TRENDING_HALF_LIFE_HOURS
+
+from .models import Cart, Favorite, Recipe
+
+
+def record_activity(recipe_id: int, delta: int) -> None:
+    Recipe.objects.filter(pk=recipe_id).update(
+        popularity=Greatest(F('popularity') + delta, Value(0)),
+        trending_score=Greatest(F('trending_score') + delta, Value(0.0)),
+    )
+
+
+def decay_trending(minutes: float,
+                   half_life_hours: float = TRENDING_HALF_LIFE_HOURS) -> int:
+    factor = 0.5 ** (minutes / 60 / half_life_hours)
+    return Recipe.objects.filter(trending_score__gt=0).update(
+        trending_score=F('trending_score') * factor
+    )
+
+
+def reconcile_popularity() -> int:
+    """Пересчитывает popularity по фактическим записям."""
+    counts = {}
+    for model in (Favorite, Cart):
+        for recipe_id, count in (
+                model.objects.order_by().values('recipe_id')
+                .annotate(count=Count('pk')).values_list('recipe_id', 'count')
+        ):
+            counts[recipe_id] = counts.get(recipe_id, 0) + count
+
+    changed = []
+    for recipe in Recipe.objects.only('id', 'popularity').iterator():
+        popularity = counts.get(recipe.pk, 0)
+        if recipe.popularity != popularity:
+            recipe.popularity = popularity
+            changed.append(recipe)
+    Recipe.objects.bulk_update(changed, ('popularity',), batch_size=1000)
+    return len(changed)
@@ -0,0 +1,145 @@
+"""Окончательное удаление рецептов, помеченных deleted_at.
+
+Строки, ссылающиеся на рецепт (ингредиенты, избранное, корзины, план
+питания, теги и т. д.), удаляются пачками в отдельных коротких
+транзакциях, и только затем удаляется сам рецепт. Поэтому удаление
+популярного рецепта не держит блокировки на горячих таблицах.
+
+Связанные строки удаляются без сигналов: популярность удаляемого
+рецепта уже не нужна, а кеш плана питания сбросил сигнал при пометке
+deleted_at.
+
+Старые рецепты, которые никто не держит в избранном, корзине или плане
+питания, можно перенести в архив тем же путём (archive_inactive).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from foodgram.constants import (RECIPE_PURGE_BATCH_SIZE, RECIPE_PURGE_CHUNK,
+                                RECIPE_PURGE_DELAY_HOURS)
+
+from .models import Cart, Favorite, MealPlanEntry, Recipe, RecipeArchive
+
+
+def dependent_relations():
+    """(модель, поле) для всех таблиц с внешним ключом на рецепт."""
+    for relation in Recipe._meta.related_objects:
+        if relation.one_to_many or relation.one_to_one:
+            yield relation.related_model, relation.field.name
+    for field in Recipe._meta.many_to_many:
+        through = field.remote_field.through
+        if through._meta.auto_created:
+            yield through, field.m2m_field_name()
+
+
+def delete_in_batches(queryset, batch_size: int) -> int:
+    model = queryset.model
+    # На строки таблиц без входящих ключей каскад не нужен.
+    raw = not model._meta.related_objects
+    deleted = 0
+    while pks := list(queryset.values_list('pk', flat=True)[:batch_size]):
+        rows = model._base_manager.filter(pk__in=pks)
+        with transaction.atomic():
+            if raw:
+                rows._raw_delete(rows.db)
+            else:
+                rows.delete()
+        deleted += len(pks)
+    return deleted
+
+
+def archive_recipes(recipes) -> None:
+    RecipeArchive.objects.bulk_create(
+        (
+            RecipeArchive(
+                recipe_id=recipe.pk,
+                author_id=recipe.author_id,
+                name=recipe.name,
+                text=recipe.text,
+                image=recipe.image.name,
+                cooking_time=recipe.cooking_time,
+                tags=[tag.slug for tag in recipe.tags.all()],
+                ingredients=[
+                    [row.ingredient.name, row.ingredient.measurement_unit,
+                     row.amount]
+                    for row in recipe.ingredientquantity_set.all()
+                ],
+                pub_date=recipe.pub_date,
+                deleted_at=recipe.deleted_at,
+            )
+            for recipe in recipes
+        ),
+        # Повторный запуск после сбоя не перезаписывает полный снимок.
+        ignore_conflicts=True,
+    )
+
+
+def purge_recipes(recipe_ids, archive: bool = True,
+                  batch_size: int = RECIPE_PURGE_BATCH_SIZE) -> None:
+    if archive:
+        archive_recipes(
+            Recipe.all_objects.filter(pk__in=recipe_ids)
+            .prefetch_related('tags', 'ingredientquantity_set__ingredient')
+        )
+    for model, field in dependent_relations():
+        delete_in_batches(
+            model._default_manager.filter(**{f'{field}__in': recipe_ids}),
+            batch_size,
+        )
+    Recipe.all_objects.filter(pk__in=recipe_ids).delete()
+
+
+def purge_expired(older_than: timedelta = None,
+                  chunk: int = RECIPE_PURGE_CHUNK, archive: bool = None,
+                  batch_size: int = RECIPE_PURGE_BATCH_SIZE) -> int:
+    """Удаляет до chunk рецептов, помеченных раньше older_than назад."""
+    if older_than is None:
+        older_than = timedelta(hours=RECIPE_PURGE_DELAY_HOURS)
+    if archive is None:
+        archive = settings.RECIPE_ARCHIVE
+    recipe_ids = list(
+        Recipe.all_objects.filter(
+            deleted_at__lte=timezone.now() - older_than
+        ).order_by('deleted_at').values_list('pk', flat=True)[:chunk]
+    )
+    if recipe_ids:
+        purge_recipes(recipe_ids, archive, batch_size)
+    return len(recipe_ids)
+
+
+def inactive_recipes(inactive_for: timedelta):
+    """Рецепты без изменений за inactive_for, которые никто не хранит."""
+    return Recipe.objects.filter(
+        updated_at__lte=timezone.now() - inactive_for,
+    ).exclude(
+        Exists(Favorite.objects.filter(recipe=OuterRef('pk')))
+        | Exists(Cart.objects.filter(recipe=OuterRef('pk')))
+        | Exists(MealPlanEntry.objects.filter(recipe=OuterRef('pk')))
+    )
+
+
+def archive_inactive(inactive_for: timedelta,
+                     chunk: int = RECIPE_PURGE_CHUNK,
+                     batch_size: int = RECIPE_PURGE_BATCH_SIZE) -> int:
+    """Переносит в архив до chunk неактивных рецептов."""
+    candidates = list(
+        inactive_recipes(inactive_for)
+        .order_by('updated_at').values_list('pk', flat=True)[:chunk]
+    )
+    now = timezone.now()
+    # Условие повторяется в UPDATE: рецепт, который успели добавить в
+    # избранное после отбора, остаётся на сайте.
+    inactive_recipes(inactive_for).filter(pk__in=candidates).update(
+        deleted_at=now
+    )
+    recipe_ids = list(
+        Recipe.all_objects.filter(pk__in=candidates, deleted_at=now)
+        .values_list('pk', flat=True)
+    )
+    if recipe_ids:
+        purge_recipes(recipe_ids, True, batch_size)
+    return len(recipe_ids)
@@ -0,0 +1,196 @@
+"""Предрасчёт похожих рецептов и персональных рекомендаций.
+
+Матрицы рецепт-ингредиент и пользователь-рецепт разрежённые, поэтому
+хранятся как инвертированные индексы (словари множеств): стоимость
+расчёта пропорциональна числу пересечений, а не квадрату числа рецептов.
+
+Это то же произведение X @ X.T разрежённой матрицы с отбором top-K по
+строке, только без NumPy/SciPy: они не входят в зависимости проекта, а
+на ожидаемых объёмах чистого Python хватает. bench_recommendations на
+синтетических данных: 1 млн строк избранного у 100 тыс. пользователей —
+около 20 с, сходство 50 тыс. рецептов по ингредиентам — около 100 с
+на одном ядре. Если расчёт перестанет укладываться в минуты, функции
+content_neighbors и cooccurrence_neighbors можно заменить на
+scipy.sparse, не меняя загрузку и сохранение.
+"""
+import heapq
+import math
+from collections import defaultdict
+
+from django.db import transaction
+
+from foodgram.constants import (RECOMMENDATIONS_BATCH_SIZE,
+                                RECOMMENDATIONS_MAX_USER_ITEMS,
+                                RECOMMENDATIONS_TOP_K)
+
+from .models import (Cart, Favorite, IngredientQuantity, Recipe,
+                     RecommendedRecipe, SimilarRecipe)
+
+# Вклад совпадения тегов относительно совпадения ингредиентов.
+TAG_WEIGHT = 0.2
+# Ингредиенты, встречающиеся в большем числе рецептов (соль, вода),
+# почти не влияют на сходство, но дают квадратичное число пар.
+MAX_POSTINGS = 1000
+# Сколько соседей рецепта учитывать при подборе рекомендаций.
+NEIGHBORS_FACTOR = 5
+
+
+def _top(scores: dict, top_k: int) -> list:
+    return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+def _replace(model, rows) -> int:
+    created = 0
+    with transaction.atomic():
+        model.objects.all().delete()
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= RECOMMENDATIONS_BATCH_SIZE:
+                model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def similar_recipes(top_k: int = RECOMMENDATIONS_TOP_K) -> dict:
+    """Соседи рецепта по косинусу ингредиентов (с весом idf) и тегам."""
+    recipe_ingredients = defaultdict(set)
+    for recipe_id, ingredient_id in (
+            IngredientQuantity.objects
+            .filter(recipe__deleted_at__isnull=True)
+            .values_list('recipe_id', 'ingredient_id')
+            .iterator()
+    ):
+        recipe_ingredients[recipe_id].add(ingredient_id)
+
+    recipe_tags = defaultdict(set)
+    for recipe_id, tag_id in (
+            Recipe.tags.through.objects
+            .filter(recipe__deleted_at__isnull=True)
+            .values_list('recipe_id', 'tag_id')
+            .iterator()
+    ):
+        recipe_tags[recipe_id].add(tag_id)
+    return content_neighbors(recipe_ingredients, recipe_tags, top_k)
+
+
+def content_neighbors(recipe_ingredients: dict, recipe_tags: dict,
+                      top_k: int) -> dict:
+    """Top-K соседей по словарям рецепт -> множество ингредиентов, тегов."""
+    postings = defaultdict(list)
+    for recipe_id, ingredients in recipe_ingredients.items():
+        for ingredient_id in ingredients:
+            postings[ingredient_id].append(recipe_id)
+
+    total = len(recipe_ingredients)
+    weights = {
+        ingredient_id: math.log(1 + total / len(recipes)) ** 2
+        for ingredient_id, recipes in postings.items()
+    }
+    norms = {
+        recipe_id: math.sqrt(sum(weights[i] for i in ingredients))
+        for recipe_id, ingredients in recipe_ingredients.items()
+    }
+
+    neighbors = {}
+    for recipe_id, ingredients in recipe_ingredients.items():
+        scores = defaultdict(float)
+        for ingredient_id in ingredients:
+            recipes = postings[ingredient_id]
+            if len(recipes) > MAX_POSTINGS:
+                continue
+            for other_id in recipes:
+                if other_id != recipe_id:
+                    scores[other_id] += weights[ingredient_id]
+
+        tags = recipe_tags.get(recipe_id, set())
+        for other_id in scores:
+            scores[other_id] /= norms[recipe_id] * norms[other_id]
+            other_tags = recipe_tags.get(other_id, set())
+            if tags and other_tags:
+                scores[other_id] += TAG_WEIGHT * (
+                    len(tags & other_tags) / len(tags | other_tags)
+                )
+        neighbors[recipe_id] = _top(scores, top_k)
+    return neighbors
+
+
+def recipe_neighbors_by_users(top_k: int) -> tuple:
+    """Соседи рецепта по совместному попаданию в избранное и корзину."""
+    user_items = defaultdict(set)
+    for model in (Favorite, Cart):
+        for user_id, recipe_id in (
+                model.objects.filter(recipe__deleted_at__isnull=True)
+                .order_by('-pk')
+                .values_list('user_id', 'recipe_id')
+                .iterator()
+        ):
+            items = user_items[user_id]
+            if len(items) < RECOMMENDATIONS_MAX_USER_ITEMS:
+                items.add(recipe_id)
+    return user_items, cooccurrence_neighbors(user_items, top_k)
+
+
+def cooccurrence_neighbors(user_items: dict, top_k: int) -> dict:
+    """Top-K соседей по словарю пользователь -> множество рецептов."""
+    popularity = defaultdict(int)
+    cooccurrence = defaultdict(lambda: defaultdict(int))
+    for items in user_items.values():
+        items = sorted(items)
+        for index, recipe_id in enumerate(items):
+            popularity[recipe_id] += 1
+            for other_id in items[index + 1:]:
+                cooccurrence[recipe_id][other_id] += 1
+                cooccurrence[other_id][recipe_id] += 1
+
+    neighbors = {}
+    for recipe_id, counts in cooccurrence.items():
+        scores = {
+            other_id: count / math.sqrt(
+                popularity[recipe_id] * popularity[other_id]
+            )
+            for other_id, count in counts.items()
+        }
+        neighbors[recipe_id] = _top(scores, top_k)
+    return neighbors
+
+
+def user_recommendations(top_k: int = RECOMMENDATIONS_TOP_K) -> dict:
+    """Рекомендации пользователю: соседи его избранного и корзины."""
+    user_items, neighbors = recipe_neighbors_by_users(
+        top_k * NEIGHBORS_FACTOR
+    )
+    authors = dict(Recipe.objects.values_list('id', 'author_id').iterator())
+
+    recommendations = {}
+    for user_id, items in user_items.items():
+        scores = defaultdict(float)
+        for recipe_id in items:
+            for other_id, score in neighbors.get(recipe_id, ()):
+                if other_id in items or authors.get(other_id) == user_id:
+                    continue
+                scores[other_id] += score
+        if scores:
+            recommendations[user_id] = _top(scores, top_k)
+    return recommendations
+
+
+def build_similar_recipes(top_k: int = RECOMMENDATIONS_TOP_K) -> int:
+    neighbors = similar_recipes(top_k)
+    return _replace(SimilarRecipe, (
+        SimilarRecipe(recipe_id=recipe_id, similar_id=other_id, score=score)
+        for recipe_id, similar in neighbors.items()
+        for other_id, score in similar
+    ))
+
+
+def build_user_recommendations(top_k: int = RECOMMENDATIONS_TOP_K) -> int:
+    recommendations = user_recommendations(top_k)
+    return _replace(RecommendedRecipe, (
+        RecommendedRecipe(user_id=user_id, recipe_id=recipe_id, score=score)
+        for user_id, recipes in recommendations.items()
+        for recipe_id, score in recipes
+    ))
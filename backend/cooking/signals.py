@@ -0,0 +1,64 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from foodgram.constants import RECIPE_PURGE_DELAY_HOURS
+
+from .meal_plan import forget_all, forget_days
+from .models import (Cart, Favorite, Ingredient, IngredientQuantity,
+                     MealPlanEntry, Recipe)
+from .popularity import record_activity
+from .tasks import purge_deleted_recipes
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Cart)
+def count_added(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.recipe_id, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Cart)
+def count_removed(sender, instance, **kwargs):
+    record_activity(instance.recipe_id, -1)
+
+
+@receiver(post_init, sender=MealPlanEntry)
+def remember_plan_date(sender, instance, **kwargs):
+    instance._initial_date = instance.date
+
+
+@receiver(post_save, sender=MealPlanEntry)
+@receiver(post_delete, sender=MealPlanEntry)
+def plan_day_changed(sender, instance, **kwargs):
+    forget_days({
+        (instance.user_id, instance.date),
+        (instance.user_id, instance._initial_date or instance.date),
+    })
+    instance._initial_date = instance.date
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=IngredientQuantity)
+@receiver(post_delete, sender=IngredientQuantity)
+def planned_recipe_changed(sender, instance, **kwargs):
+    recipe_id = instance.pk if sender is Recipe else instance.recipe_id
+    forget_days(
+        MealPlanEntry.objects.filter(recipe_id=recipe_id)
+        .values_list('user_id', 'date')
+        .distinct()
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def schedule_purge(sender, instance, update_fields=None, **kwargs):
+    if instance.deleted_at and update_fields and 'deleted_at' in update_fields:
+        purge_deleted_recipes.schedule(
+            countdown=RECIPE_PURGE_DELAY_HOURS * 60 * 60
+        )
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def catalogue_changed(sender, **kwargs):
+    forget_all()
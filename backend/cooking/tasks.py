@@ -0,0 +1,26 @@
+from foodgram.constants import RECIPE_PURGE_CHUNK
+from taskqueue.registry import task
+
+from . import popularity, purge, recommendations
+
+
+@task()
+def reconcile_popularity():
+    return popularity.reconcile_popularity()
+
+
+@task()
+def decay_trending(minutes: float):
+    return popularity.decay_trending(minutes)
+
+
+@task(max_attempts=1)
+def build_recommendations():
+    recommendations.build_similar_recipes()
+    recommendations.build_user_recommendations()
+
+
+@task()
+def purge_deleted_recipes():
+    if purge.purge_expired() == RECIPE_PURGE_CHUNK:
+        purge_deleted_recipes.delay()
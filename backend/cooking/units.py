@@ -0,0 +1,103 @@
+"""Приведение единиц измерения для списка покупок.
+
+Таблица покрывает единицы из каталога ингредиентов (data/ingredients.*).
+Массы сводятся к граммам, объёмы к миллилитрам. Остальные единицы
+(шт., по вкусу, пучок и т. п.) не переводятся и суммируются только
+сами с собой.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable, NamedTuple
+
+MASS = 'mass'
+VOLUME = 'volume'
+
+UNIT_ALIASES = {
+    'гр': 'г',
+    'гр.': 'г',
+    'грамм': 'г',
+    'кг.': 'кг',
+    'килограмм': 'кг',
+    'мг.': 'мг',
+    'мл.': 'мл',
+    'л.': 'л',
+    'литр': 'л',
+    'ст.л.': 'ст. л.',
+    'ст л': 'ст. л.',
+    'столовая ложка': 'ст. л.',
+    'ч.л.': 'ч. л.',
+    'ч л': 'ч. л.',
+    'чайная ложка': 'ч. л.',
+    'шт': 'шт.',
+}
+
+# Единица: (величина, сколько базовых единиц в одной).
+CONVERSIONS = {
+    'мг': (MASS, Decimal('0.001')),
+    'г': (MASS, Decimal(1)),
+    'кг': (MASS, Decimal(1000)),
+    'мл': (VOLUME, Decimal(1)),
+    'л': (VOLUME, Decimal(1000)),
+    'стакан': (VOLUME, Decimal(200)),
+    'ст. л.': (VOLUME, Decimal(15)),
+    'ч. л.': (VOLUME, Decimal(5)),
+    'капля': (VOLUME, Decimal('0.05')),
+}
+
+# Базовая единица и крупная, в которую переводятся большие суммы.
+DISPLAY_UNITS = {
+    MASS: ('г', 'кг'),
+    VOLUME: ('мл', 'л'),
+}
+LARGE_UNIT_THRESHOLD = Decimal(1000)
+
+
+class ShoppingItem(NamedTuple):
+    name: str
+    amount: Decimal
+    unit: str
+
+
+def normalize_unit(unit: str) -> str:
+    unit = ' '.join(unit.lower().split())
+    return UNIT_ALIASES.get(unit, unit)
+
+
+def merge_amounts(rows: Iterable[tuple]) -> list:
+    """Сводит строки (название, единица, количество) за один проход.
+
+    Строки одного продукта в единицах одной величины складываются
+    в базовой единице. Если продукт встретился только в одной единице,
+    она сохраняется: «2 ст. л.» не превращаются в «30 мл».
+    """
+    totals = defaultdict(Decimal)
+    units = defaultdict(set)
+    for name, unit, amount in rows:
+        unit = normalize_unit(unit)
+        dimension, factor = CONVERSIONS.get(unit, (unit, Decimal(1)))
+        key = (name, dimension)
+        totals[key] += Decimal(amount) * factor
+        units[key].add(unit)
+
+    items = []
+    for (name, dimension), total in totals.items():
+        if len(units[(name, dimension)]) == 1:
+            unit, = units[(name, dimension)]
+            items.append(ShoppingItem(
+                name, total / CONVERSIONS.get(unit, (None, 1))[1], unit
+            ))
+        else:
+            items.append(ShoppingItem(name, *display(total, dimension)))
+    return sorted(items, key=lambda item: (item.name, item.unit))
+
+
+def display(total: Decimal, dimension: str) -> tuple:
+    base, large = DISPLAY_UNITS[dimension]
+    if total >= LARGE_UNIT_THRESHOLD:
+        return total / CONVERSIONS[large][1], large
+    return total, base
+
+
+def format_amount(amount: Decimal) -> str:
+    amount = amount.quantize(Decimal('0.01')).normalize()
+    return f'{amount:f}'
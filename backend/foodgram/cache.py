@@ -0,0 +1,38 @@
+from typing import Optional
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from foodgram.constants import LOCAL_CACHE_TIMEOUT
+
+# Записи этих кешей видны только процессу, который их сделал.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def is_shared_cache(alias: str = DEFAULT_CACHE_ALIAS) -> bool:
+    """Видят ли все воркеры одни и те же записи и их удаление."""
+    return not isinstance(caches[alias], PROCESS_LOCAL_CACHES)
+
+
+def is_memory_cache(alias: str = DEFAULT_CACHE_ALIAS) -> bool:
+    """Общий кеш, обращение к которому не стоит запросов к базе."""
+    return is_shared_cache(alias) and not isinstance(
+        caches[alias], DatabaseCache
+    )
+
+
+def shared_timeout(timeout: Optional[int],
+                   alias: str = DEFAULT_CACHE_ALIAS) -> Optional[int]:
+    """Время жизни записи, которую сбрасывают из любого процесса.
+
+    Сброс из другого воркера или management-команды не доходит до
+    кеша процесса, поэтому там запись живёт не дольше
+    LOCAL_CACHE_TIMEOUT.
+    """
+    if is_shared_cache(alias):
+        return timeout
+    if timeout is None:
+        return LOCAL_CACHE_TIMEOUT
+    return min(timeout, LOCAL_CACHE_TIMEOUT)
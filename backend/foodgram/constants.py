@@ -4,3 +4,51 @@ MAX_PAGE_SIZE: int = 100
 
 SLICE_NAME_INGREDIENT: int = 30
 SLICE_NAME_TAG: int = 50
+
+RECOMMENDATIONS_TOP_K: int = 10
+RECOMMENDATIONS_MAX_USER_ITEMS: int = 200
+RECOMMENDATIONS_BATCH_SIZE: int = 5000
+
+ADMIN_EXACT_COUNT_LIMIT: int = 10000
+ADMIN_TEXT_PREVIEW: int = 50
+
+TOKEN_CACHE_TIMEOUT: int = 5 * 60
+LOCAL_CACHE_TIMEOUT: int = 60
+
+VIEWER_CONTEXT_MAX_IDS: int = 5000
+
+RECIPE_LIST_MAX_AGE: int = 10
+CATALOG_MAX_AGE: int = 5 * 60
+
+TRENDING_HALF_LIFE_HOURS: int = 72
+TRENDING_DECAY_INTERVAL_MINUTES: int = 60
+
+TASK_MAX_ATTEMPTS: int = 3
+TASK_RETRY_DELAY: int = 30
+TASK_VISIBILITY_TIMEOUT: int = 5 * 60
+TASK_POLL_INTERVAL: float = 1.0
+TASK_BATCH_SIZE: int = 10
+
+RESPONSE_CACHE_TIMEOUT: int = 5 * 60
+WARMUP_PAGES: int = 5
+WARMUP_POPULAR_RECIPES: int = 50
+WARMUP_WORKERS: int = 4
+
+MEDIA_GC_GRACE_HOURS: int = 24
+
+MEAL_PLAN_MAX_DAYS: int = 62
+MEAL_PLAN_CACHE_TIMEOUT: int = 24 * 60 * 60
+
+TRANSFER_BATCH_SIZE: int = 1000
+
+NOTIFY_FANOUT_CHUNK: int = 1000
+NOTIFY_DIGEST_BATCH: int = 200
+
+THROTTLE_CACHE_ALIAS: str = 'default'
+
+RECIPES_LIMIT_MAX: int = 20
+
+RECIPE_PURGE_DELAY_HOURS: int = 24
+RECIPE_PURGE_CHUNK: int = 100
+RECIPE_PURGE_BATCH_SIZE: int = 1000
+RECIPE_ARCHIVE_INACTIVE_DAYS: int = 365
@@ -0,0 +1,42 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from foodgram.constants import ADMIN_EXACT_COUNT_LIMIT
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки без COUNT(*) по большим таблицам.
+
+    Для выборки без фильтров число строк берётся из статистики
+    PostgreSQL (pg_class.reltuples). Постоянный фильтр менеджера по
+    умолчанию, например скрытие удалённых рецептов, фильтром не
+    считается: такие строки быстро вычищаются, и оценка остаётся
+    близкой. Точный подсчёт остаётся для отфильтрованных выборок и
+    небольших таблиц.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        if estimate is not None and estimate > ADMIN_EXACT_COUNT_LIMIT:
+            return estimate
+        return super().count
+
+    def estimated_count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return None
+        manager = queryset.model._default_manager
+        if queryset.query.where != manager.all().query.where:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row else None
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -33,6 +34,8 @@ INSTALLED_APPS = [
     'cooking.apps.CookingConfig',
     'users.apps.UsersConfig',
     'api.apps.ApiConfig',
+    'taskqueue.apps.TaskQueueConfig',
+    'notifications.apps.NotificationsConfig',
 ]
 
 MIDDLEWARE = [
@@ -45,6 +48,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Сжатие ответов в Django для развёртываний без nginx; в
+# производственном профиле ответы сжимает nginx.
+if env.bool('GZIP_RESPONSES', default=False):
+    MIDDLEWARE.insert(1, 'django.middleware.gzip.GZipMiddleware')
+
 ROOT_URLCONF = 'foodgram.urls'
 
 TEMPLATES = [
@@ -76,6 +84,53 @@ DATABASES = {
     }
 }
 
+# Кеш общий для всех воркеров gunicorn и фоновых задач: в нём живут
+# счётчики ограничений, токены и версии закешированных ответов. По
+# умолчанию это memcached из docker compose. dbcache:// тоже общий, но
+# каждая запись в нём — несколько запросов к базе, поэтому токены в нём
+# не кешируются. locmemcache:// подходит только для разработки в одном
+# процессе: токены тогда не кешируются, а ответы и планы питания живут
+# не дольше LOCAL_CACHE_TIMEOUT.
+CACHE_URL = env('CACHE_URL', default='pymemcache://memcached:11211')
+CACHES = {'default': environ.Env.cache_url_config(CACHE_URL)}
+if CACHE_URL.startswith('pymemcache://'):
+    # django-environ 0.11 сопоставляет pymemcache:// с PyLibMCCache.
+    CACHES['default']['BACKEND'] = (
+        'django.core.cache.backends.memcached.PyMemcacheCache'
+    )
+
+PASSWORD_HASHER = env('PASSWORD_HASHER', default='pbkdf2')
+
+PASSWORD_PBKDF2_ITERATIONS = env.int(
+    'PASSWORD_PBKDF2_ITERATIONS', default=260000
+)
+
+PASSWORD_ARGON2_TIME_COST = env.int('PASSWORD_ARGON2_TIME_COST', default=2)
+
+PASSWORD_ARGON2_MEMORY_COST = env.int(
+    'PASSWORD_ARGON2_MEMORY_COST', default=102400
+)
+
+PASSWORD_ARGON2_PARALLELISM = env.int('PASSWORD_ARGON2_PARALLELISM', default=8)
+
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'users.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'users.hashers.TunedArgon2PasswordHasher',
+}
+if PASSWORD_HASHER.lower() not in PASSWORD_HASHER_CLASSES:
+    raise ImproperlyConfigured(
+        f'PASSWORD_HASHER={PASSWORD_HASHER!r}: допустимы '
+        f'{", ".join(PASSWORD_HASHER_CLASSES)}'
+    )
+
+# Первый хешер используется для новых паролей, остальные только для
+# проверки: пароль со старым хешем пересчитывается при входе.
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[PASSWORD_HASHER.lower()],
+    *(path for name, path in PASSWORD_HASHER_CLASSES.items()
+      if name != PASSWORD_HASHER.lower()),
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -115,10 +170,32 @@ AUTH_USER_MODEL = 'users.User'
 
 ADMIN_EMAIL = env('ADMIN_EMAIL')
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = env(
+    'EMAIL_BACKEND',
+    default='django.core.mail.backends.filebased.EmailBackend'
+)
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Способ доставки дайджестов: notifications.senders.EmailSender
+# или notifications.senders.WebhookSender.
+NOTIFICATIONS_SENDER = env(
+    'NOTIFICATIONS_SENDER', default='notifications.senders.EmailSender'
+)
+NOTIFICATIONS_WEBHOOK_URL = env('NOTIFICATIONS_WEBHOOK_URL', default='')
+NOTIFICATIONS_WEBHOOK_TIMEOUT = env.int(
+    'NOTIFICATIONS_WEBHOOK_TIMEOUT', default=10
+)
+
+# Выполнять фоновые задачи сразу, без воркера (разработка, тесты).
+TASKS_EAGER = env.bool('TASKS_EAGER', default=False)
+
+# Сохранять снимок рецепта в архив перед окончательным удалением.
+RECIPE_ARCHIVE = env.bool('RECIPE_ARCHIVE', default=True)
+
+# Прогревать кеш ответов при старте каждого воркера gunicorn.
+WARMUP_ON_START = env.bool('WARMUP_ON_START', default=False)
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
@@ -126,11 +203,29 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.TokenBucketThrottle',
+    ),
+    # Перед Django стоит один nginx: адрес клиента — последний элемент
+    # X-Forwarded-For, остальные клиент мог подставить сам.
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=1),
+    # Ограничиваются только представления с throttle_scope.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': env('THROTTLE_LOGIN', default='10/min'),
+        'recipe_links': env('THROTTLE_RECIPE_LINKS', default='60/min'),
+        'shopping_list': env('THROTTLE_SHOPPING_LIST', default='10/min'),
+        'subscribe': env('THROTTLE_SUBSCRIBE', default='30/min'),
+    },
     'TEST_REQUEST_RENDERER_CLASSES': [
         'rest_framework.renderers.MultiPartRenderer',
         'rest_framework.renderers.JSONRenderer',
@@ -142,6 +237,8 @@ REST_FRAMEWORK = {
 DJOSER = {
     'SET_PASSWORD_RETYPE': False,
     'LOGIN_FIELD': 'email',
+    'PASSWORD_RESET_CONFIRM_URL': 'password/reset/confirm/{uid}/{token}',
+    'USERNAME_RESET_CONFIRM_URL': 'email/reset/confirm/{uid}/{token}',
     'SERIALIZERS': {
         'current_user': 'api.serializers.AuthorSerializer',
     },
@@ -0,0 +1,57 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASH_CHUNK_SIZE = 64 * 1024
+HASHED_NAME_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Файлы именуются по sha256 содержимого.
+
+    Имя получается вида <каталог>/ab/<sha256>.<расширение>: одинаковые
+    загрузки попадают в один файл, а файл по адресу никогда не меняется,
+    поэтому его URL можно кешировать бессрочно. Каталог и расширение
+    берутся из имени, которое предложило поле модели.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        try:
+            # Свежее mtime не даёт gc_recipe_images удалить файл, на
+            # который снова ссылаются, до сохранения новой ссылки.
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return super().save(name, content, max_length)
+        return name
+
+    @staticmethod
+    def hashed_name(name: str, content) -> str:
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        digest = digest.hexdigest()
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], f'{digest}{extension}')
+
+
+def content_hash(name: str):
+    """sha256 из имени файла, записанного ContentAddressedStorage."""
+    stem = os.path.splitext(os.path.basename(name or ''))[0]
+    return stem if HASHED_NAME_RE.match(stem) else None
+
+
+def recipe_image_storage():
+    return ContentAddressedStorage()
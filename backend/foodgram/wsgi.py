@@ -1,7 +1,12 @@
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
 
 application = get_wsgi_application()
+
+# URLconf загружается здесь, а не на первом запросе: при запуске
+# gunicorn с preload воркеры получают готовые модули от мастера.
+get_resolver().url_patterns
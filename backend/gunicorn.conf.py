@@ -0,0 +1,53 @@
+"""Конфигурация gunicorn для API.
+
+Все параметры можно переопределить переменными окружения GUNICORN_*.
+Сравнить профили на своей машине: python manage.py bench_gunicorn.
+"""
+import gc
+import multiprocessing
+import os
+
+
+def env(name, default, cast=str):
+    value = os.environ.get(f'GUNICORN_{name}')
+    return default if value is None else cast(value)
+
+
+bind = env('BIND', '0.0.0.0:8000')
+
+# gthread: медленная загрузка картинки занимает поток, а не весь воркер.
+# Для асинхронных воркеров (gevent) нужен соответствующий пакет.
+worker_class = env('WORKER_CLASS', 'gthread')
+workers = env('WORKERS', multiprocessing.cpu_count() * 2 + 1, int)
+threads = env('THREADS', 4, int)
+
+timeout = env('TIMEOUT', 30, int)
+graceful_timeout = env('GRACEFUL_TIMEOUT', 30, int)
+# Дольше, чем keepalive_timeout соединений nginx с бэкендом, чтобы
+# gunicorn не закрывал соединение, которое nginx считает живым.
+keepalive = env('KEEPALIVE', 75, int)
+
+# Перезапуск воркеров ограничивает рост памяти; jitter разносит
+# перезапуски во времени, чтобы воркеры не уходили одновременно.
+max_requests = env('MAX_REQUESTS', 1000, int)
+max_requests_jitter = env('MAX_REQUESTS_JITTER', 100, int)
+
+preload_app = env('PRELOAD', 'true', str).lower() == 'true'
+worker_tmp_dir = env('WORKER_TMP_DIR', '/dev/shm')
+accesslog = env('ACCESSLOG', '-')
+
+
+def when_ready(server):
+    # С preload приложение уже загружено в мастере: созданные объекты
+    # больше не обходит сборщик мусора, поэтому страницы памяти мастера
+    # остаются общими с воркерами после fork.
+    if server.cfg.preload_app:
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+
+    if settings.WARMUP_ON_START:
+        from api.warmup import warmup_in_background
+        warmup_in_background()
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from cooking.admin import LargeTableAdmin
+
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ('pk', 'user', 'recipe', 'created_at', 'sent_at',)
+    list_select_related = ('user', 'recipe__author',)
+    autocomplete_fields = ('user', 'recipe',)
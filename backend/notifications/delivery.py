@@ -0,0 +1,90 @@
+"""Рассылка уведомлений о новых рецептах подписчикам.
+
+Рассылка делится на два этапа. fan_out создаёт строки Notification
+для одной пачки подписчиков автора; следующая пачка обрабатывается
+отдельной задачей, поэтому у автора с любым числом подписчиков каждая
+задача короткая. send_digests раз в период (infra/crontab) собирает
+неотправленные уведомления и отправляет каждому пользователю одно
+сообщение.
+"""
+from itertools import groupby
+
+from django.utils import timezone
+
+from cooking.models import Recipe
+from foodgram.constants import NOTIFY_DIGEST_BATCH, NOTIFY_FANOUT_CHUNK
+from users.models import Subscribe
+
+from .models import Notification
+from .senders import Digest, get_sender
+
+
+def fan_out(recipe_id: int, after_id: int = 0,
+            chunk: int = NOTIFY_FANOUT_CHUNK):
+    """Уведомляет пачку подписчиков; возвращает курсор следующей пачки.
+
+    Курсор — pk последней обработанной подписки, None — пачек больше нет.
+    """
+    author_id = (
+        Recipe.objects.filter(pk=recipe_id)
+        .values_list('author_id', flat=True).first()
+    )
+    if author_id is None:
+        return None
+    subscriptions = list(
+        Subscribe.objects.filter(author_id=author_id, pk__gt=after_id)
+        .order_by('pk')
+        .values_list('pk', 'user_id')[:chunk]
+    )
+    Notification.objects.bulk_create(
+        (Notification(user_id=user_id, recipe_id=recipe_id)
+         for _, user_id in subscriptions),
+        ignore_conflicts=True,
+    )
+    if len(subscriptions) < chunk:
+        return None
+    return subscriptions[-1][0]
+
+
+def send_digests(batch: int = NOTIFY_DIGEST_BATCH, sender=None) -> int:
+    """Отправляет дайджесты пачками пользователей; возвращает их число."""
+    sender = sender or get_sender()
+    # Об удалённом рецепте уже не сообщить, а строки иначе ждали бы
+    # окончательного удаления рецепта.
+    Notification.objects.filter(
+        sent_at__isnull=True, recipe__deleted_at__isnull=False
+    ).delete()
+    pending = Notification.objects.filter(
+        sent_at__isnull=True, recipe__deleted_at__isnull=True
+    )
+    sent = 0
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            pending.filter(user_id__gt=last_user_id)
+            .order_by('user_id')
+            .values_list('user_id', flat=True)
+            .distinct()[:batch]
+        )
+        if not user_ids:
+            return sent
+        last_user_id = user_ids[-1]
+
+        notifications = list(
+            pending.filter(user_id__in=user_ids)
+            .select_related('user', 'recipe__author')
+            .order_by('user_id', 'pk')
+        )
+        digests = [
+            Digest(group[0].user, [item.recipe for item in group])
+            for group in (
+                list(items) for _, items in groupby(
+                    notifications, key=lambda item: item.user_id
+                )
+            )
+        ]
+        sender.send(digests)
+        Notification.objects.filter(
+            pk__in=[item.pk for item in notifications]
+        ).update(sent_at=timezone.now())
+        sent += len(digests)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from notifications.delivery import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет каждому пользователю один дайджест новых рецептов '
+        'авторов из его подписок. Запускается по расписанию из '
+        'infra/crontab.'
+    )
+
+    def handle(self, *args, **options):
+        sent = send_digests()
+        self.stdout.write(f'Отправлено дайджестов: {sent}.')
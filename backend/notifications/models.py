@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from cooking.models import Recipe
+
+User = get_user_model()
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Рецепт'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+
+    class Meta:
+        ordering = ('pk',)
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        indexes = (
+            # Дайджест читает только неотправленные уведомления.
+            models.Index(
+                fields=('user',),
+                condition=models.Q(sent_at__isnull=True),
+                name='notification_pending_idx'
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_user_recipe_notification'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} ← {self.recipe.name}'
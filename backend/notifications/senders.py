@@ -0,0 +1,64 @@
+from typing import NamedTuple
+
+import requests
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+
+
+class Digest(NamedTuple):
+    user: object
+    recipes: list
+
+
+class EmailSender:
+    """Письма через EMAIL_BACKEND, одно соединение на пачку дайджестов."""
+    subject = 'Новые рецепты на Foodgram'
+
+    def send(self, digests) -> None:
+        messages = [
+            EmailMessage(
+                subject=self.subject,
+                body=self.render(digest),
+                from_email=settings.ADMIN_EMAIL,
+                to=(digest.user.email,),
+            )
+            for digest in digests
+        ]
+        get_connection().send_messages(messages)
+
+    @staticmethod
+    def render(digest: Digest) -> str:
+        lines = [
+            f'Здравствуйте, {digest.user.first_name or digest.user.username}!',
+            '',
+            'Новые рецепты авторов, на которых вы подписаны:',
+        ]
+        lines.extend(
+            f'- {recipe.name} ({recipe.author.username})'
+            for recipe in digest.recipes
+        )
+        return '\n'.join(lines)
+
+
+class WebhookSender:
+    """Один POST с JSON всех дайджестов пачки на NOTIFICATIONS_WEBHOOK_URL."""
+
+    def send(self, digests) -> None:
+        response = requests.post(
+            settings.NOTIFICATIONS_WEBHOOK_URL,
+            json={'digests': [
+                {
+                    'user': digest.user.pk,
+                    'email': digest.user.email,
+                    'recipes': [recipe.pk for recipe in digest.recipes],
+                }
+                for digest in digests
+            ]},
+            timeout=settings.NOTIFICATIONS_WEBHOOK_TIMEOUT,
+        )
+        response.raise_for_status()
+
+
+def get_sender():
+    return import_string(settings.NOTIFICATIONS_SENDER)()
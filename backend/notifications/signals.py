@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from cooking.models import Recipe
+
+from .tasks import fan_out_recipe
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_published(sender, instance, created, raw=False, **kwargs):
+    # Рассылка идёт фоновыми задачами: создание рецепта только ставит
+    # одну задачу в очередь после фиксации транзакции.
+    if created and not raw:
+        fan_out_recipe.delay(instance.pk)
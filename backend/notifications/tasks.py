@@ -0,0 +1,15 @@
+from taskqueue.registry import task
+
+from . import delivery
+
+
+@task()
+def fan_out_recipe(recipe_id: int, after_id: int = 0):
+    next_id = delivery.fan_out(recipe_id, after_id)
+    if next_id is not None:
+        fan_out_recipe.delay(recipe_id, next_id)
+
+
+@task()
+def send_digests():
+    return delivery.send_digests()
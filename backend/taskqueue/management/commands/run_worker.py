@@ -0,0 +1,42 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from foodgram.constants import TASK_BATCH_SIZE, TASK_POLL_INTERVAL
+from taskqueue.worker import run_batch
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch', type=int, default=TASK_BATCH_SIZE,
+            help='Сколько задач выполнить подряд, прежде чем проверить '
+                 'сигнал остановки.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=TASK_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        while self.running:
+            close_old_connections()
+            done = run_batch(options['batch'])
+            if options['once'] and not done:
+                break
+            if not done:
+                time.sleep(options['sleep'])
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from foodgram.constants import TASK_MAX_ATTEMPTS, TASK_RETRY_DELAY
+
+registry = {}
+
+
+class TaskFunction:
+    """Функция, которую можно выполнить сразу или поставить в очередь.
+
+    Аргументы задачи сохраняются в JSON, поэтому передавать нужно
+    идентификаторы и простые значения, а не объекты моделей.
+    """
+
+    def __init__(self, func, name, max_attempts, retry_delay):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.schedule(args, kwargs)
+
+    def schedule(self, args=(), kwargs=None, countdown: float = 0):
+        """Ставит задачу в очередь после фиксации текущей транзакции."""
+        kwargs = kwargs or {}
+        if settings.TASKS_EAGER:
+            transaction.on_commit(lambda: self.func(*args, **kwargs))
+            return None
+
+        from .models import Task
+        task = Task(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs,
+            max_attempts=self.max_attempts,
+            run_after=timezone.now() + timedelta(seconds=countdown),
+        )
+        transaction.on_commit(task.save)
+        return task
+
+    def retry_at(self, attempts: int):
+        delay = self.retry_delay * 2 ** max(attempts - 1, 0)
+        return timezone.now() + timedelta(seconds=delay)
+
+
+def task(name: str = None, max_attempts: int = TASK_MAX_ATTEMPTS,
+         retry_delay: float = TASK_RETRY_DELAY):
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = TaskFunction(
+            func, task_name, max_attempts, retry_delay
+        )
+        return registry[task_name]
+    return decorator
@@ -0,0 +1,90 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from foodgram.constants import TASK_VISIBILITY_TIMEOUT
+
+from .models import Task
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+EXPIRED_ERROR = 'Воркер не завершил задачу за время видимости'
+
+
+def claim(batch_size: int,
+          visibility_timeout: float = TASK_VISIBILITY_TIMEOUT):
+    """Забирает задачи, готовые к запуску, и задачи зависших воркеров.
+
+    Взятая задача невидима для других воркеров до locked_until; если
+    воркер не завершил её за это время, задача выполняется повторно.
+    Зависшая задача, исчерпавшая попытки, помечается как ошибка.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        Task.objects.filter(
+            status=Task.RUNNING,
+            locked_until__lt=now,
+            attempts__gte=F('max_attempts'),
+        ).update(
+            status=Task.FAILED, locked_until=None, last_error=EXPIRED_ERROR
+        )
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Task.PENDING, run_after__lte=now)
+                | Q(status=Task.RUNNING, locked_until__lt=now)
+            )
+            .order_by('run_after')[:batch_size]
+        )
+        for task in tasks:
+            task.status = Task.RUNNING
+            task.attempts += 1
+            task.locked_until = now + timedelta(seconds=visibility_timeout)
+        Task.objects.bulk_update(
+            tasks, ('status', 'attempts', 'locked_until')
+        )
+    return tasks
+
+
+def execute(task: Task) -> bool:
+    func = registry.get(task.name)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {task.name} не зарегистрирована')
+        func(*task.args, **task.kwargs)
+    except Exception:
+        logger.exception('Задача %s завершилась с ошибкой', task)
+        task.last_error = traceback.format_exc()
+        task.locked_until = None
+        if func is not None and task.attempts < task.max_attempts:
+            task.status = Task.PENDING
+            task.run_after = func.retry_at(task.attempts)
+        else:
+            task.status = Task.FAILED
+        task.save(update_fields=(
+            'status', 'run_after', 'locked_until', 'last_error',
+        ))
+        return False
+    task.delete()
+    return True
+
+
+def run_batch(batch_size: int) -> int:
+    """Выполняет до batch_size задач, забирая их по одной.
+
+    Время видимости отсчитывается от начала каждой задачи, а не всей
+    пачки, поэтому долгая задача не отдаёт следующие другим воркерам.
+    """
+    done = 0
+    while done < batch_size:
+        tasks = claim(1)
+        if not tasks:
+            break
+        execute(tasks[0])
+        done += 1
+    return done
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from foodgram.paginators import EstimatedCountPaginator
+
 from .models import Subscribe, User
 
 
@@ -15,9 +17,11 @@ class UserAdmin(admin.ModelAdmin):
         'is_active'
     )
     search_fields = ('username', 'email')
-    list_filter = ('first_name', 'last_name')
+    list_filter = ('is_staff', 'is_active')
     ordering = ('username',)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Subscribe)
@@ -25,4 +29,8 @@ class Subscribe(admin.ModelAdmin):
     list_display = (
         'pk', 'user', 'author',
     )
+    list_select_related = ('user', 'author',)
+    autocomplete_fields = ('user', 'author',)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (Argon2PasswordHasher,
+                                         PBKDF2PasswordHasher)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 с числом итераций из настроек.
+
+    Алгоритм не меняется, поэтому старые хеши проверяются как прежде,
+    а хеши с другим числом итераций пересчитываются при входе.
+    """
+    iterations = getattr(
+        settings, 'PASSWORD_PBKDF2_ITERATIONS',
+        PBKDF2PasswordHasher.iterations
+    )
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2 с параметрами стоимости из настроек."""
+    time_cost = getattr(
+        settings, 'PASSWORD_ARGON2_TIME_COST',
+        Argon2PasswordHasher.time_cost
+    )
+    memory_cost = getattr(
+        settings, 'PASSWORD_ARGON2_MEMORY_COST',
+        Argon2PasswordHasher.memory_cost
+    )
+    parallelism = getattr(
+        settings, 'PASSWORD_ARGON2_PARALLELISM',
+        Argon2PasswordHasher.parallelism
+    )
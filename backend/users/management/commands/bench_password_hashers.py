@@ -0,0 +1,50 @@
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность регистрации (хеширование) '
+        'и входа (проверка пароля) на одно ядро для каждого хешера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rounds', type=int, default=20,
+            help='Сколько раз хешировать и проверять пароль.'
+        )
+        parser.add_argument(
+            '--target-rps', type=float, default=0,
+            help='Ожидаемое число входов в секунду для оценки воркеров.'
+        )
+
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+        password = 'correct horse battery staple'
+        for position, hasher in enumerate(get_hashers()):
+            encoded = hasher.encode(password, hasher.salt())
+            signup = self.per_second(
+                lambda: hasher.encode(password, hasher.salt()), rounds
+            )
+            login = self.per_second(
+                lambda: hasher.verify(password, encoded), rounds
+            )
+            role = 'новые пароли' if position == 0 else 'только проверка'
+            self.stdout.write(
+                f'{hasher.algorithm} ({role}): '
+                f'регистрация {signup:.1f}/с, вход {login:.1f}/с на ядро'
+            )
+            if options['target_rps']:
+                self.stdout.write(
+                    f'  ядер для {options["target_rps"]:.0f} входов/с: '
+                    f'{options["target_rps"] / login:.1f}'
+                )
+
+    @staticmethod
+    def per_second(func, rounds: int) -> float:
+        started = time.process_time()
+        for _ in range(rounds):
+            func()
+        return rounds / (time.process_time() - started)
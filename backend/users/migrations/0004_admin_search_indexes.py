@@ -0,0 +1,39 @@
+from django.db import migrations
+
+INDEXES = (
+    ('users_user_username_trgm',
+     'CREATE INDEX IF NOT EXISTS users_user_username_trgm '
+     'ON users_user USING gin (username gin_trgm_ops)'),
+    ('users_user_email_trgm',
+     'CREATE INDEX IF NOT EXISTS users_user_email_trgm '
+     'ON users_user USING gin (email gin_trgm_ops)'),
+    ('users_user_username_upper',
+     'CREATE INDEX IF NOT EXISTS users_user_username_upper '
+     'ON users_user (UPPER(username))'),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for _, sql in INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_username_validator'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
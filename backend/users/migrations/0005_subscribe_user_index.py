@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscribe',
+            index=models.Index(fields=['user', 'author'], name='subscribe_user_author_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# Поиск админки по icontains в PostgreSQL сравнивает
+# UPPER("username"::text) LIKE UPPER(%s), поэтому индекс по самому
+# столбцу не используется; нужен индекс по тому же выражению.
+INDEXES = (
+    ('users_user_username_upper_trgm',
+     'CREATE INDEX IF NOT EXISTS users_user_username_upper_trgm '
+     'ON users_user USING gin (UPPER(username::text) gin_trgm_ops)',
+     'users_user_username_trgm',
+     'CREATE INDEX IF NOT EXISTS users_user_username_trgm '
+     'ON users_user USING gin (username gin_trgm_ops)'),
+    ('users_user_email_upper_trgm',
+     'CREATE INDEX IF NOT EXISTS users_user_email_upper_trgm '
+     'ON users_user USING gin (UPPER(email::text) gin_trgm_ops)',
+     'users_user_email_trgm',
+     'CREATE INDEX IF NOT EXISTS users_user_email_trgm '
+     'ON users_user USING gin (email gin_trgm_ops)'),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for _, sql, old_name, _ in INDEXES:
+        schema_editor.execute(sql)
+        schema_editor.execute(f'DROP INDEX IF EXISTS {old_name}')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _, old_sql in INDEXES:
+        schema_editor.execute(old_sql)
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_subscribe_user_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -57,6 +57,14 @@ class Subscribe(models.Model):
     )
 
     class Meta:
+        # Уникальный индекс начинается с author, а подписки читаются
+        # по user.
+        indexes = (
+            models.Index(
+                fields=('user', 'author'),
+                name='subscribe_user_author_idx'
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=['author', 'user'],